@@ -0,0 +1,318 @@
+"""
+Micro-benchmarks for the per-roll and per-keystroke hot paths: item parsing, open affix
+detection, mod matching, mod table search and column sorting, over synthetic corpora.
+
+Usage (from the repository root):
+    python benchmarks/bench_hot_paths.py --output benchmarks/baseline.json
+    python benchmarks/bench_hot_paths.py --compare benchmarks/baseline.json [--threshold 1.5]
+
+In compare mode the exit status is 1 when any benchmark is slower than the baseline by
+more than the threshold factor; flagged benchmarks are measured again before they count,
+so a burst of load on the machine is not reported as a regression.
+
+Each sample runs a benchmark often enough to take at least 0.1 s. A run starts --processes
+fresh interpreters, each taking --repeat samples per benchmark in rounds over all of them
+(so background load spreads over many benchmarks instead of skewing one), and reports the
+fastest sample. Timings of the same code differ between interpreter processes by more than
+between samples, which a single process cannot average out.
+
+The compare_mods/filter benchmarks start every run with empty ModMatcher memos, so they
+measure the automaton for the first occurrence of each mod template and memo hits after
+that, as in a craft session.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from controllers.mod_database import ModTable
+from controllers.mod_parser import ModParser
+
+SIZES = (100, 1000, 10000)
+
+SINGLE_MODS = [
+    ("Prefix", "Damage, Elemental, Fire", "{v}({lo}-{hi})% increased Fire Damage"),
+    ("Prefix", "Damage, Elemental, Cold", "{v}({lo}-{hi})% increased Cold Damage"),
+    ("Prefix", "Defences, Energy Shield", "{v}({lo}-{hi})% faster start of Energy Shield Recharge"),
+    ("Prefix", "Attack, Speed", "{v}({lo}-{hi})% increased Attack Speed while Dual Wielding"),
+    ("Suffix", "Damage, Chaos", "+{v}({lo}-{hi})% to Chaos Damage over Time Multiplier"),
+    ("Suffix", "Critical", "{v}({lo}-{hi})% increased Global Critical Strike Chance"),
+    ("Suffix", "Resistance, Elemental, Fire, Cold", "+{v}({lo}-{hi})% to Fire and Cold Resistances"),
+]
+HYBRID_MODS = [
+    ("Suffix", "Elemental, Cold, Ailment", ["{v}({lo}-{hi})% chance to Freeze", "{v}({lo}-{hi})% increased Freeze Duration on Enemies"]),
+    ("Suffix", "Physical, Ailment", ["Attacks have {v}({lo}-{hi})% chance to cause Bleeding", "{v}({lo}-{hi})% increased Bleeding Duration"]),
+]
+
+
+def roll_line(template, rng):
+    low = rng.randint(1, 20)
+    high = low + rng.randint(1, 10)
+    return template.format(v=rng.randint(low, high), lo=low, hi=high)
+
+
+def make_item(rng, rarity, affix_count):
+    lines = ["Item Class: Jewels", f"Rarity: {rarity}", "Synthetic Cobalt Jewel", "--------",
+             f"Item Level: {rng.randint(1, 86)}", "--------"]
+    for _ in range(affix_count):
+        if rng.random() < 0.25:
+            affix_type, tags, templates = rng.choice(HYBRID_MODS)
+        else:
+            affix_type, tags, template = rng.choice(SINGLE_MODS)
+            templates = [template]
+        lines.append(f'{{ {affix_type} Modifier "Synthetic" (Tier: {rng.randint(1, 5)}) — {tags} }}')
+        lines.extend(roll_line(template, rng) for template in templates)
+    lines.append("--------")
+    return "\n".join(lines)
+
+
+def make_items(size, rng):
+    items = []
+    for _ in range(size):
+        if rng.random() < 0.3:
+            items.append(make_item(rng, "Rare", 6))
+        else:
+            items.append(make_item(rng, "Magic", rng.randint(1, 2)))
+    return items
+
+
+def make_table(size, rng):
+    words = ["Fire", "Cold", "Lightning", "Chaos", "Attack", "Cast", "Speed", "Damage", "Critical",
+             "Strike", "Chance", "Duration", "Energy", "Shield", "Minion", "Totem", "Trap", "Mine"]
+    mods, tags = [], []
+    for _ in range(size):
+        low = rng.randint(1, 30)
+        mods.append(f"({low}-{low + rng.randint(1, 10)})% increased " + " ".join(rng.sample(words, 3)))
+        tags.append("".join(rng.sample(words, 2)))
+    columns = {
+        "Mod": mods,
+        "Tag": tags,
+        "Tier": array('i', (rng.randint(1, 5) for _ in range(size))),
+        "iLvl": array('i', (rng.randint(1, 86) for _ in range(size))),
+        "Weight": array('i', (rng.choice((0, 100, 250, 500, 1000)) for _ in range(size))),
+        "Prefix%": array('d', (rng.random() * 5 for _ in range(size))),
+        "Weight%": array('d', (rng.random() * 5 for _ in range(size))),
+    }
+    return ModTable("synthetic_prefix.csv", columns)
+
+
+MIN_SAMPLE_SECONDS = 0.1
+CONFIRM_ROUNDS = 2  # Extra measurements of a flagged benchmark before it counts as a regression
+
+
+class Benchmark:
+    def __init__(self, name, function, operations):
+        self.name = name
+        self.timer = timeit.Timer(function)
+        self.operations = operations
+        self.number = 1
+        self.best = float("inf")  # Seconds per call
+
+    def calibrate(self):
+        """Pick the number of calls per sample so that a sample lasts MIN_SAMPLE_SECONDS."""
+        while True:
+            seconds = self.timer.timeit(self.number)
+            if seconds >= MIN_SAMPLE_SECONDS:
+                break
+            self.number = max(self.number * 2, int(self.number * MIN_SAMPLE_SECONDS / max(seconds, 1e-9)))
+        self.best = min(self.best, seconds / self.number)
+
+    def sample(self):
+        self.best = min(self.best, self.timer.timeit(self.number) / self.number)
+
+    def result(self):
+        return {"seconds": self.best, "us_per_op": self.best / self.operations * 1e6}
+
+
+def measure(benchmarks, repeat):
+    """Best time of every benchmark over `repeat` interleaved rounds."""
+    for benchmark in benchmarks:
+        benchmark.calibrate()
+    for _ in range(repeat - 1):
+        for benchmark in benchmarks:
+            benchmark.sample()
+    return {benchmark.name: benchmark.result() for benchmark in benchmarks}
+
+
+SELECTED_MODS = ["(14-16)% increased Fire Damage", "(3-5)% chance to Freeze",
+                 "+(6-8)% to Chaos Damage over Time Multiplier"]
+FILTER_EXPRESSION = ('COUNT("increased Fire Damage", "chance to Freeze") >= 1 '
+                     'AND NOT "Chaos Damage" [tier <= 1] OR "Life" [value >= 10, prefix]')
+QUERIES = ["f", "fi", "fir", "fire", "fire d", "fire da", "cold", "sp", "speed", "xyz"]
+
+
+def build(sizes, seed):
+    rng = random.Random(seed)
+    benchmarks = []
+    for size in sizes:
+        benchmarks.extend(size_benchmarks(size, rng))
+    return benchmarks
+
+
+def size_benchmarks(size, rng):
+    """The benchmarks over one corpus size; each closes over its own items and table."""
+    parser = ModParser()
+    matcher = parser.compile_targets(SELECTED_MODS)
+    mod_filter = parser.compile_filter(FILTER_EXPRESSION)
+    items = make_items(size, rng)
+    parsed_items = [parser.parse_item(item) for item in items]
+    table = make_table(size, rng)
+
+    def parse():
+        for item in items:
+            parser.parse_mods(item)
+
+    def parse_item():
+        for item in items:
+            parser.parse_item(item)
+
+    def open_affixes():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for item in parsed_items:
+                parser.get_open_affixes(item)
+
+    def compare_compiled():
+        matcher._memo.clear()
+        for item in parsed_items:
+            parser.compare_mods(item, matcher)
+
+    def compare_filter():
+        mod_filter.matcher._memo.clear()
+        for item in parsed_items:
+            mod_filter.matches(item)
+
+    def compare_list():
+        parser._compiled.clear()  # Compiles the list once per run
+        for item in parsed_items:
+            parser.compare_mods(item, SELECTED_MODS)
+
+    def search():
+        index = table.get_search_index()
+        for query in QUERIES:
+            index.search(query)
+
+    def sort():
+        table._sort_orders.clear()
+        for column in ("Mod", "Tag", "iLvl", "Weight"):
+            table.sort_order(column)
+            table.sort_order(column, descending=True)
+
+    table.get_search_index()  # The index is built once per table, not per keystroke
+    return [Benchmark(f"{name}[{size}]", function, operations) for name, function, operations in (
+        ("parse_mods", parse, size),
+        ("parse_item", parse_item, size),
+        ("get_open_affixes", open_affixes, size),
+        ("compare_mods_compiled", compare_compiled, size),
+        ("compare_mods_list", compare_list, size),
+        ("filter_expression", compare_filter, size),
+        ("search", search, len(QUERIES)),
+        ("sort", sort, 8),
+    )]
+
+
+def run_workers(args, names=None):
+    """Best result per benchmark over args.processes worker processes."""
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(args.repeat),
+               "--seed", str(args.seed), "--sizes", *map(str, args.sizes)]
+    if names:
+        command += ["--only", *names]
+    results = {}
+    for _ in range(args.processes):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        for name, result in json.loads(output).items():
+            if name not in results or result["seconds"] < results[name]["seconds"]:
+                results[name] = result
+    return results
+
+
+def merge_best(results, new_results):
+    for name, result in new_results.items():
+        if result["seconds"] < results[name]["seconds"]:
+            results[name] = result
+
+
+def slower(results, baseline, threshold):
+    """Names of the benchmarks slower than the baseline by more than the threshold."""
+    names = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and previous["us_per_op"] and current["us_per_op"] / previous["us_per_op"] > threshold:
+            names.append(name)
+    return names
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    print(f"{'benchmark':<32}{'baseline us':>14}{'current us':>14}{'ratio':>8}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:<32}{'-':>14}{current['us_per_op']:>14.3f}{'new':>8}")
+            continue
+        ratio = current["us_per_op"] / previous["us_per_op"] if previous["us_per_op"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{name:<32}{previous['us_per_op']:>14.3f}{current['us_per_op']:>14.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark in each process")
+    parser.add_argument("--processes", type=int, default=3, help="worker processes per run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown factor in compare mode")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--only", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        benchmarks = build(args.sizes, args.seed)
+        if args.only:
+            benchmarks = [benchmark for benchmark in benchmarks if benchmark.name in args.only]
+        print(json.dumps(measure(benchmarks, args.repeat)))
+        return
+
+    results = run_workers(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "sizes": args.sizes,
+                "results": results,
+            }, file, indent=2)
+        print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        for _ in range(CONFIRM_ROUNDS):
+            flagged = slower(results, baseline, args.threshold)
+            if not flagged:
+                break
+            merge_best(results, run_workers(args, flagged))
+        regressions = compare(results, baseline, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    if not args.output:
+        print(f"{'benchmark':<32}{'us/op':>12}")
+        for name, result in results.items():
+            print(f"{name:<32}{result['us_per_op']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares clipboard read latency across the clipboard backends.
+
+Usage (from the repository root):
+    python benchmarks/clipboard_latency.py [--reads 200] [--backends pyperclip tk fake]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from controllers.clipboard_backends import CLIPBOARD_BACKENDS, create_clipboard_backend
+
+SAMPLE_TEXT = """Item Class: Jewels
+Rarity: Magic
+Flaming Cobalt Jewel of Atrophy
+--------
+Item Level: 84
+--------
+{ Prefix Modifier "Flaming" (Tier: 1) — Damage, Elemental, Fire }
+16(14-16)% increased Fire Damage
+"""
+
+
+def measure(backend, reads):
+    backend.copy(SAMPLE_TEXT)
+    timings = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        backend.paste()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p99_ms": timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=list(CLIPBOARD_BACKENDS))
+    args = parser.parse_args()
+
+    print(f"{'backend':<12}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name in args.backends:
+        backend = None
+        try:
+            backend = create_clipboard_backend(name)
+            result = measure(backend, args.reads)
+        except Exception as e:
+            print(f"{name:<12}unavailable: {e}")
+            continue
+        finally:
+            if backend is not None:
+                backend.close()
+        print(f"{name:<12}{result['mean_ms']:>10.4f}{result['p50_ms']:>10.4f}{result['p99_ms']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
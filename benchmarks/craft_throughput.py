@@ -0,0 +1,96 @@
+"""
+End-to-end craft loop throughput against the headless SimulatedGame.
+
+Runs MagicCraftController with the simulated input and clipboard backends (all delays set to
+zero unless --keep-delays is given) and reports rolls per second and per-stage latency.
+
+Usage (from the repository root):
+    python benchmarks/craft_throughput.py [--rolls 2000] [--target "(14-16)% increased Fire Damage"]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from controllers.craft_controllers.magic_craft_controller import MagicCraftController
+from controllers.game_simulator import SimulatedGame
+from controllers.mod_database import ModDatabase
+
+
+def timed(stage, function, timings):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings.setdefault(stage, []).append(time.perf_counter() - start)
+    return wrapper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rolls", type=int, default=2000, help="total currency applications to run")
+    parser.add_argument("--target", action="append", help="selected mod (repeatable); default: an unreachable mod")
+    parser.add_argument("--item-level", type=int, default=84)
+    parser.add_argument("--mod-file", default="prefix_jewel.csv", help="mod file of the crafted base type")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep-delays", action="store_true", help="keep the delays from options.json")
+    parser.add_argument("--item-cache-size", type=int, help="parse/match cache entries (0 disables it); default: options.json")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    stash_positions = MagicCraftController.load_items_positions()
+    options = MagicCraftController.load_options()
+    mod_database = ModDatabase().load()
+    game = SimulatedGame(mod_database, stash_positions,
+                         options.get("currency_block_size", (42, 42)), options.get("item_block_size", (84, 166)),
+                         item_level=args.item_level, seed=args.seed, mod_file=args.mod_file)
+
+    controller = MagicCraftController(input_backend=game.input, clipboard=game.clipboard,
+                                      mod_database=mod_database, mod_file=args.mod_file)
+    if not args.keep_delays:
+        controller.keyboard.key_press_delay = 0
+        controller.keyboard.clipboard_copy_delay = 0
+        controller.mouse.duration = 0
+        controller.mouse.click_delay = 0
+    if args.item_cache_size is not None:
+        controller.item_cache.resize(args.item_cache_size)
+
+    timings = {}
+    controller.mouse.move = timed("mouse move", controller.mouse.move, timings)
+    controller.mouse.click = timed("click", controller.mouse.click, timings)
+    controller.keyboard.get_clipboard_data = timed("clipboard copy", controller.keyboard.get_clipboard_data, timings)
+    controller.mod_parser.parse_item = timed("parse", controller.mod_parser.parse_item, timings)
+    controller.mod_parser.compare_mods = timed("match", controller.mod_parser.compare_mods, timings)
+
+    selected_mods = args.target or ["This mod does not exist"]
+    sessions = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while sum(game.currency_used.values()) < args.rolls:
+            controller.max_retries = args.rolls - sum(game.currency_used.values())
+            game.set_item("Normal")
+            controller.start_magic_craft(selected_mods)
+            sessions += 1
+    elapsed = time.perf_counter() - start
+
+    rolls = sum(game.currency_used.values())
+    print(f"{rolls} rolls in {elapsed:.3f}s over {sessions} session(s): {rolls / elapsed:.1f} rolls/s")
+    print(f"currency used: {game.currency_used}")
+    cache = controller.item_cache.stats()
+    print(f"item cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.1%}), {cache['evictions']} evictions")
+    print(f"{'stage':<16}{'calls':>8}{'mean us':>12}{'p99 us':>12}")
+    for stage, values in timings.items():
+        values.sort()
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(f"{stage:<16}{len(values):>8}{statistics.fmean(values) * 1e6:>12.1f}{p99 * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Measures cold start of the app: time to finish the startup imports, to draw the window and
+to build the first tab. Each run launches `src/main.py --startup-time` in a new process.
+
+Usage (from the repository root):
+    python benchmarks/startup_time.py [--runs 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "main.py")
+MARK_RE = re.compile(r"([\w ]+?) (\d+) ms")
+
+
+def measure_once():
+    output = subprocess.run([sys.executable, MAIN, "--startup-time"], capture_output=True, text=True, check=True).stdout
+    for line in output.splitlines():
+        if line.startswith("Startup: "):
+            return {name.strip(): int(ms) for name, ms in MARK_RE.findall(line[len("Startup: "):])}
+    raise RuntimeError(f"No startup report in output:\n{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    print(f"{'milestone':<14}{'median ms':>12}{'max ms':>10}")
+    for name in runs[0]:
+        values = [run[name] for run in runs if name in run]
+        print(f"{name:<14}{statistics.median(values):>12.0f}{max(values):>10}")
+
+
+if __name__ == "__main__":
+    main()
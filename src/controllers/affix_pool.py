@@ -0,0 +1,45 @@
+from controllers.mod_parser import ModMatcher
+
+# Chance that an Orb of Alteration/Transmutation rolls both a prefix and a suffix on a magic item
+MAGIC_TWO_AFFIX_CHANCE = 0.5
+
+
+class AffixPool:
+    """
+    Rows of one mod table that can roll at an item level, with their weights and a bit mask
+    of the selected mods each row satisfies (bit i set when selected mod i matches the row).
+    """
+    def __init__(self, table, item_level, matcher):
+        self.table = table
+        self.rows = []
+        self.weights = []
+        self.target_masks = []
+        if table is None:
+            self.total_weight = 0
+            return
+
+        for row in range(len(table)):
+            weight = table.weights[row]
+            if weight <= 0 or table.item_levels[row] > item_level:
+                continue
+            mask = 0
+            for target in matcher.matched_targets([{"template": table.templates[row]}]):
+                mask |= 1 << target
+            self.rows.append(row)
+            self.weights.append(weight)
+            self.target_masks.append(mask)
+        self.total_weight = sum(self.weights)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def build_affix_pools(mod_database, filename, item_level, selected_mods):
+    """
+    Returns (prefix pool, suffix pool, full target mask) for the base type of `filename`.
+    """
+    matcher = selected_mods if isinstance(selected_mods, ModMatcher) else ModMatcher(selected_mods)
+    tables = mod_database.affix_tables(filename)
+    prefix_pool = AffixPool(tables["prefix"], item_level, matcher)
+    suffix_pool = AffixPool(tables["suffix"], item_level, matcher)
+    return prefix_pool, suffix_pool, (1 << matcher.target_count) - 1
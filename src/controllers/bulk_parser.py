@@ -0,0 +1,75 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from controllers.mod_parser import ModParser
+
+_parser = ModParser()
+
+
+def iter_item_texts(source):
+    """
+    Splits a stream of concatenated item texts (a stash dump, a session log) into items.
+
+    An item starts at an "Item Class:" line, or at a "Rarity:" line not directly preceded by
+    one. `source` is a path, an open text file or any iterable of lines.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as file:
+            yield from iter_item_texts(file)
+        return
+
+    lines = []
+    previous = ""
+    for line in source:
+        line = line.rstrip("\r\n")
+        starts_item = line.startswith("Item Class:") or (line.startswith("Rarity:") and not previous.startswith("Item Class:"))
+        if starts_item and any(lines):
+            yield "\n".join(lines).strip("\n")
+            lines = []
+        lines.append(line)
+        if line.strip():
+            previous = line
+    if any(lines):
+        yield "\n".join(lines).strip("\n")
+
+
+def _chunks(texts, chunk_size):
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_chunk(texts):
+    """Worker entry point: parse_mods for every item text of a chunk."""
+    return [_parser.parse_mods(text) for text in texts]
+
+
+def parse_items_bulk(source, processes=None, chunk_size=256, max_pending=None):
+    """
+    Parses every item in `source` and yields the parse_mods result of each one, in input order.
+
+    Chunks of `chunk_size` items are parsed across a process pool. At most `max_pending`
+    chunks (default: twice the worker count) are in flight, which bounds memory use on
+    large inputs. processes=1 parses in the calling process.
+    """
+    chunks = _chunks(iter_item_texts(source), chunk_size)
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1:
+        for chunk in chunks:
+            yield from parse_chunk(chunk)
+        return
+
+    max_pending = max_pending or processes * 2
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parse_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,196 @@
+import queue
+import threading
+import tkinter as tk
+
+# How often the Tk clipboard thread handles Tk events (clipboard requests of other programs) while idle
+TK_EVENT_INTERVAL = 0.05
+# How long paste() and copy() wait for the Tk clipboard thread before giving up
+TK_CALL_TIMEOUT = 2.0
+
+
+class ClipboardBackend:
+    """
+    Minimal clipboard interface used by KeyboardController.
+    """
+    name = "base"
+
+    def paste(self):
+        raise NotImplementedError
+
+    def copy(self, text):
+        raise NotImplementedError
+
+    def clear(self):
+        self.copy('')
+
+    def close(self):
+        """Release what the backend holds (threads, interpreters)."""
+
+
+class PyperclipBackend(ClipboardBackend):
+    """
+    pyperclip based backend. On Linux every call spawns an xclip/xsel process.
+    """
+    name = "pyperclip"
+
+    def __init__(self):
+        import pyperclip
+        self._pyperclip = pyperclip
+
+    def paste(self):
+        return self._pyperclip.paste()
+
+    def copy(self, text):
+        self._pyperclip.copy(text)
+
+
+class TkClipboardBackend(ClipboardBackend):
+    """
+    In-process backend, so no process is spawned per read. One hidden Tk interpreter, created
+    by a dedicated clipboard thread, serves every call: Tk may only be used from the thread
+    that created it, so paste() and copy() hand their request to that thread and wait.
+    The thread starts on first use and close() stops it and destroys the interpreter; calls
+    after close() raise RuntimeError.
+    """
+    name = "tk"
+
+    def __init__(self):
+        self._requests = queue.Queue()
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _call(self, function):
+        done = threading.Event()
+        result = {}
+        # Queued under the lock, so every request lands before the stop sentinel of close()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Tk clipboard backend is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, name="tk-clipboard", daemon=True)
+                self._thread.start()
+            self._requests.put((function, result, done))
+        if not done.wait(TK_CALL_TIMEOUT):
+            raise TimeoutError(f"Tk clipboard thread did not answer within {TK_CALL_TIMEOUT}s")
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+
+    def _serve(self):
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError as e:
+            root, startup_error = None, e  # No display: every request fails with the same error
+
+        last_error = None
+        while True:
+            try:
+                request = self._requests.get(timeout=TK_EVENT_INTERVAL)
+            except queue.Empty:
+                if root is not None:
+                    try:
+                        root.update()  # Serve the clipboard we own to other programs
+                    except Exception as e:
+                        # Keep serving requests; report each distinct error once instead of every interval
+                        if str(e) != last_error:
+                            print(f"Error handling Tk clipboard events: {e}")
+                            last_error = str(e)
+                continue
+            if request is None:
+                break
+            function, result, done = request
+            try:
+                if root is None:
+                    raise startup_error
+                result["value"] = function(root)
+            except Exception as e:
+                result["error"] = e
+            done.set()
+
+        # Nothing may wait on a stopped thread
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                function, result, done = request
+                result["error"] = RuntimeError("Tk clipboard backend is closed")
+                done.set()
+
+        if root is not None:
+            try:
+                root.destroy()
+            except Exception as e:
+                print(f"Error closing the Tk clipboard: {e}")
+
+    @staticmethod
+    def _paste(root):
+        try:
+            return root.clipboard_get()
+        except tk.TclError:
+            # Raised when the clipboard is empty or holds no text
+            return ''
+
+    def paste(self):
+        return self._call(self._paste)
+
+    def copy(self, text):
+        def copy(root):
+            root.clipboard_clear()
+            if text:
+                root.clipboard_append(text)
+            root.update_idletasks()
+        self._call(copy)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._requests.put(None)
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+
+class FakeClipboardBackend(ClipboardBackend):
+    """
+    In-memory clipboard for tests, benchmarks and simulated runs.
+    """
+    name = "fake"
+
+    def __init__(self, text=''):
+        self._text = text
+        self._lock = threading.Lock()
+        self.paste_count = 0
+        self.copy_count = 0
+
+    def paste(self):
+        with self._lock:
+            self.paste_count += 1
+            return self._text
+
+    def copy(self, text):
+        with self._lock:
+            self.copy_count += 1
+            self._text = text
+
+
+CLIPBOARD_BACKENDS = {
+    PyperclipBackend.name: PyperclipBackend,
+    TkClipboardBackend.name: TkClipboardBackend,
+    FakeClipboardBackend.name: FakeClipboardBackend,
+}
+
+
+def create_clipboard_backend(name="pyperclip"):
+    """
+    Creates the clipboard backend registered under `name`.
+    """
+    try:
+        backend_class = CLIPBOARD_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown clipboard backend '{name}'. Available: {', '.join(CLIPBOARD_BACKENDS)}")
+    return backend_class()
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+
+# Typed options with their defaults; nested dicts are validated key by key
+OPTION_SCHEMA = {
+    "stop_key": (str, "f3"),
+    "max_retries": (int, 3),
+    "clipboard_backend": (str, "pyperclip"),
+    "input_backend": (str, "desktop"),
+    "hold_shift_currency": (bool, False),
+    "telemetry_directory": (str, "logs"),
+    "item_cache_size": (int, 0),
+    "currency_block_size": (list, [42, 42]),
+    "item_block_size": (list, [84, 166]),
+    "execution_delays": {
+        "key_press_delay": (float, 0.1),
+        "clipboard_copy_delay": (float, 0.1),
+        "clipboard_timeout": (float, 1.0),
+        "clipboard_poll_interval": (float, 0.005),
+        "mouse_speed": (float, 0.24),
+    },
+}
+
+# Options that are counts or sizes and must not be negative
+NON_NEGATIVE_OPTIONS = ("max_retries", "item_cache_size")
+
+# Orbs used by the craft controllers, by index into stash.json's main_currency
+REQUIRED_CURRENCY_SLOTS = 9
+
+
+def validate_options(data, schema=OPTION_SCHEMA, path=""):
+    """
+    Returns the options merged over the schema defaults. Values of the wrong type are
+    reported and replaced by their default; unknown keys are kept as they are.
+    Raises ValueError if the options are not a JSON object.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"options must be a JSON object, got {type(data).__name__}")
+    options = dict(data)
+    for key, spec in schema.items():
+        if isinstance(spec, dict):
+            value = data.get(key, {})
+            if not isinstance(value, dict):
+                print(f"Error: option '{path}{key}' must be an object. Using defaults.")
+                value = {}
+            options[key] = validate_options(value, spec, f"{path}{key}.")
+            continue
+
+        value_type, default = spec
+        value = data.get(key, default)
+        if value_type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, value_type) or (value_type is int and isinstance(value, bool)):
+            print(f"Error: option '{path}{key}' must be {value_type.__name__}, got {value!r}. Using {default!r}.")
+            value = default
+        elif (value_type is float or key in NON_NEGATIVE_OPTIONS) and value < 0:
+            print(f"Error: option '{path}{key}' must not be negative. Using {default!r}.")
+            value = default
+        elif value_type is list and not (len(value) == 2 and all(isinstance(v, (int, float)) for v in value)):
+            print(f"Error: option '{path}{key}' must be a [width, height] pair. Using {default!r}.")
+            value = default
+        options[key] = value
+    return options
+
+
+def validate_stash(data):
+    """Checks the stash layout the craft controllers rely on; raises ValueError if it is unusable."""
+    if not isinstance(data, dict):
+        raise ValueError(f"stash layout must be a JSON object, got {type(data).__name__}")
+    currencies = data.get("main_currency")
+    if not isinstance(currencies, list) or len(currencies) < REQUIRED_CURRENCY_SLOTS:
+        raise ValueError(f"main_currency must list at least {REQUIRED_CURRENCY_SLOTS} currency slots")
+    for index, currency in enumerate(currencies):
+        if not isinstance(currency, dict):
+            raise ValueError(f"main_currency entry {index} must be an object")
+        if not _is_position(currency.get("position")):
+            raise ValueError(f"currency '{currency.get('name')}' needs an [x, y] position")
+    item_slot = data.get("item_slot")
+    if not isinstance(item_slot, dict) or not _is_position(item_slot.get("position")):
+        raise ValueError("item_slot needs an [x, y] position")
+    grid = data.get("item_grid")
+    if grid is not None:
+        if not isinstance(grid, dict) or not _is_position(grid.get("position")):
+            raise ValueError("item_grid needs an [x, y] position")
+        for key in ("rows", "columns"):
+            if not isinstance(grid.get(key), int) or grid[key] < 1:
+                raise ValueError(f"item_grid {key} must be a positive integer")
+    return data
+
+
+def _is_position(position):
+    return (isinstance(position, list) and len(position) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in position))
+
+
+class ConfigFile:
+    """
+    One JSON config file, parsed once and re-read only when its mtime or size changes.
+    """
+    def __init__(self, path, validate, required=True):
+        self.path = path
+        self.validate = validate
+        self.required = required
+        self.data = None
+        self.signature = None
+
+    def stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Loads the file if it changed; returns True when new data was loaded."""
+        signature = self.stat_signature()
+        if signature == self.signature and self.data is not None:
+            return False
+
+        if signature is None:
+            if self.required:
+                raise FileNotFoundError(f"Config file not found: {self.path}")
+            if self.data is None:
+                print(f"Error: {self.path} not found. Using defaults.")
+            self.signature = None
+            self.data = self.validate({})
+            return True
+
+        try:
+            with open(self.path, "r") as file:
+                data = self.validate(json.load(file))
+        except (ValueError, OSError) as e:
+            # Keep serving the last good config, e.g. while the file is being edited
+            if self.data is None:
+                raise
+            print(f"Error reloading {self.path}: {e}. Keeping the previous settings.")
+            self.signature = signature
+            return False
+
+        self.data = data
+        self.signature = signature
+        return True
+
+
+class ConfigService:
+    """
+    Single source of the options and stash layout.
+
+    Files are parsed once and served from memory. check_for_changes() stats the files at
+    most once per poll_interval and, when one changed, reloads it and calls every subscriber
+    with the names of the changed configs ("options", "stash"). Craft loops call it between
+    rolls, so changes are applied on the craft thread and never mid-roll.
+    """
+    def __init__(self, options_path="config/options.json", stash_path="config/stash.json", poll_interval=1.0):
+        self.files = {
+            "options": ConfigFile(options_path, validate_options, required=False),
+            "stash": ConfigFile(stash_path, validate_stash),
+        }
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    @property
+    def options(self):
+        """Validated options (read-only)."""
+        return self._get("options")
+
+    @property
+    def stash(self):
+        """Stash layout from stash.json (read-only)."""
+        return self._get("stash")
+
+    def _get(self, name):
+        config = self.files[name]
+        if config.data is None:
+            with self._lock:
+                if config.data is None:
+                    config.load()
+        return config.data
+
+    def delay(self, name):
+        """An execution delay in seconds."""
+        return self.options["execution_delays"][name]
+
+    def subscribe(self, callback):
+        """Call `callback(changed)` after a reload; returns a function that unsubscribes."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def check_for_changes(self, force=False):
+        """
+        Reloads changed files and notifies subscribers. Cheap enough to call every roll:
+        the files are only stat'ed once per poll_interval. Returns the set of changed names.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return set()
+        self._next_poll = now + self.poll_interval
+
+        changed = set()
+        with self._lock:
+            for name, config in self.files.items():
+                if config.data is not None and config.load():
+                    changed.add(name)
+
+        if changed:
+            print(f"Reloaded {', '.join(sorted(changed))} config.")
+            for callback in list(self._subscribers):
+                callback(changed)
+        return changed
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_config_service():
+    """Returns the process-wide ConfigService."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConfigService()
+        return _service
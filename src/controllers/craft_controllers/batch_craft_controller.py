@@ -0,0 +1,114 @@
+import json
+import math
+import os
+
+
+class BatchCraftController:
+    """
+    Crafts every cell of a stash grid to the selected mods, one cell after another.
+
+    The grid comes from the "item_grid" entry of stash.json. Cells are visited in a
+    nearest-neighbour order starting at the currency, and a held currency (Shift-held mode)
+    is kept across cells so it is only picked up again when the orb changes. Finished cells
+    are written to a checkpoint file, so an interrupted batch resumes where it stopped.
+    """
+    def __init__(self, craft_controller, checkpoint_path="config/batch_checkpoint.json"):
+        self.craft_controller = craft_controller
+        self.checkpoint_path = checkpoint_path
+
+    @property
+    def grid(self):
+        # Read through the craft controller so a reloaded stash.json applies to the next batch
+        return self.craft_controller.stash_items_positions.get("item_grid")
+
+    def get_cells(self):
+        """Returns {(column, row): [x, y] center} for every cell of the grid."""
+        if not self.grid:
+            return {}
+        origin_x, origin_y = self.grid["position"]
+        cell_width, cell_height = self.grid.get("cell_size", self.craft_controller.item_block)
+        return {
+            (column, row): [origin_x + (column + 0.5) * cell_width, origin_y + (row + 0.5) * cell_height]
+            for row in range(self.grid["rows"])
+            for column in range(self.grid["columns"])
+        }
+
+    @staticmethod
+    def plan_route(cells, start):
+        """
+        Orders cells greedily by nearest neighbour from `start`, which on a grid gives a
+        snake path with no long jumps between consecutive cells.
+        """
+        remaining = dict(cells)
+        route = []
+        position = start
+        while remaining:
+            cell = min(remaining, key=lambda key: (math.dist(position, remaining[key]), key))
+            position = remaining.pop(cell)
+            route.append(cell)
+        return route
+
+    @staticmethod
+    def checkpoint_targets(selected_mods):
+        # A filter expression is stored as is, a list of mods as a JSON list
+        return selected_mods if isinstance(selected_mods, str) else list(selected_mods)
+
+    def load_checkpoint(self, selected_mods):
+        """Cells finished by an interrupted batch with the same grid and mods."""
+        try:
+            with open(self.checkpoint_path, "r") as file:
+                checkpoint = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if checkpoint.get("grid") != self.grid or checkpoint.get("selected_mods") != self.checkpoint_targets(selected_mods):
+            return {}
+        return {tuple(cell): result for cell, result in checkpoint.get("cells", [])}
+
+    def save_checkpoint(self, selected_mods, finished):
+        with open(self.checkpoint_path, "w") as file:
+            json.dump({
+                "grid": self.grid,
+                "selected_mods": self.checkpoint_targets(selected_mods),
+                "cells": [[list(cell), result] for cell, result in finished.items()],
+            }, file)
+
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def start_batch_craft(self, selected_mods):
+        """
+        Crafts all unfinished cells. Returns {(column, row): True/False} for every finished cell.
+        """
+        controller = self.craft_controller
+        cells = self.get_cells()
+        if not cells:
+            print("Error: No item_grid configured in stash.json.")
+            return {}
+
+        finished = self.load_checkpoint(selected_mods)
+        if finished:
+            print(f"Resuming batch: {len(finished)}/{len(cells)} cells already done.")
+
+        pending = {cell: center for cell, center in cells.items() if cell not in finished}
+        route = self.plan_route(pending, controller.get_currency_center(controller.orb_of_alteration))
+        controller.mouse.register_anchors(controller.mouse.anchors + [cells[cell] for cell in route])
+
+        controller.begin_session(selected_mods)
+        try:
+            for cell in route:
+                if controller.stop_loop:
+                    break
+                controller.report_progress("batch", cell=cell, done=len(finished), total=len(cells))
+                # A cell that already matches returns on its first copy without using currency
+                result = controller.run_craft(cells[cell])
+                if controller.stop_loop:
+                    break
+                finished[cell] = result
+                self.save_checkpoint(selected_mods, finished)
+        finally:
+            controller.end_session()
+
+        if len(finished) == len(cells):
+            self.clear_checkpoint()
+        return finished
@@ -0,0 +1,50 @@
+import queue
+import threading
+
+
+class CraftWorker:
+    """
+    Runs a craft session on a dedicated thread so the GUI stays responsive.
+
+    The controller reports progress as dicts into `progress`, which the GUI drains with after().
+    Cancelling sets the controller's stop event, which interrupts its waits immediately.
+    """
+    def __init__(self, controller):
+        self.controller = controller
+        self.progress = queue.Queue()
+        self.thread = None
+
+    def start(self, selected_mods, craft=None):
+        """
+        Start `craft(selected_mods)` on the worker thread; defaults to the controller's
+        start_magic_craft.
+        """
+        if self.is_running():
+            raise RuntimeError("A craft session is already running.")
+
+        self.controller.progress_callback = self.progress.put
+        craft = craft or self.controller.start_magic_craft
+        self.thread = threading.Thread(target=self.run, args=(craft, selected_mods), name="craft-worker", daemon=True)
+        self.thread.start()
+
+    def run(self, craft, selected_mods):
+        try:
+            result = craft(selected_mods)
+            self.progress.put({"status": "finished", "result": result})
+        except Exception as e:
+            self.progress.put({"status": "error", "error": str(e)})
+
+    def cancel(self):
+        self.controller.stop_loop = True
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def drain(self):
+        """Return every progress update queued since the last call."""
+        updates = []
+        while True:
+            try:
+                updates.append(self.progress.get_nowait())
+            except queue.Empty:
+                return updates
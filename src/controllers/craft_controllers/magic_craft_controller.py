@@ -1,22 +1,64 @@
-import json
-import time
+import threading
+from controllers.config_service import get_config_service
+from controllers.item_cache import ItemCheckCache
 from controllers.keyboard_controller import KeyboardController
 from controllers.mouse_controller import MouseController
 from controllers.mod_parser import ModParser
+from controllers.roll_telemetry import RollTelemetry
 
 class MagicCraftController:
-    def __init__(self):
-        # Load configurations
-        self.config = self.load_options()
-        self.stash_items_positions = self.load_items_positions()
+    def __init__(self, input_backend=None, clipboard=None, mod_database=None, mod_file=None):
+        # Options and stash positions come from the shared config service and are re-applied
+        # between rolls when the files change (see apply_config)
+        self.config_service = get_config_service()
+        self.config = self.config_service.options
+        self.stash_items_positions = self.config_service.stash
         
+        # Stop loop logic: the event interrupts every wait in the keyboard and mouse controllers
+        self.stop_event = threading.Event()
+        self.progress_callback = None
+        self.telemetry = RollTelemetry()
+
+        # Initialize controllers
+        # input_backend/clipboard default to the real desktop; a SimulatedGame provides both for headless runs
+        self.keyboard = KeyboardController(clipboard=clipboard, stop_event=self.stop_event, input_backend=input_backend)
+        self.mouse = MouseController(self)
+        self.mod_parser = ModParser(mod_database, mod_file)  # With the base type's mod files, rolls carry their row's weight and tier
+        
+        self.item_data = None
+        self.selected_mods = []
+        self.mod_matcher = self.mod_parser.compile_filter([])
+        self.item_cache = ItemCheckCache(self.config_service.options["item_cache_size"])  # Parse/match results of repeated rolls
+        self.stop_loop = False
+        self.held_currency = None  # Currency kept on the cursor while Shift is held
+        self.stop_key = None
+
+        self.apply_config()
+        self._config_changed = False
+        self.unsubscribe_config = self.config_service.subscribe(self.on_config_changed)
+
+    def apply_config(self):
+        """
+        Read the options and stash positions from the config service. Runs at construction
+        and, after a config file changed, between rolls (see refresh_config).
+        """
+        self.config = self.config_service.options
+        if self.config_service.stash is not self.stash_items_positions:
+            # Currency slots may have moved; put back what the cursor holds
+            self.release_currency()
+        self.stash_items_positions = self.config_service.stash
+        self.keyboard.apply_options(self.config)
+
         # Load options
-        self.stop_key = self.config.get("stop_key", "f3")  # Default is F3
-        self.max_retries = self.config.get("max_retries", 3) 
-        self.currency_block = self.config.get("currency_block_size", [42, 42])
-        self.item_block = self.config.get("item_block_size", [84, 166])
-        self.clipboard_copy_delay = self.config.get("execution_delays", {}).get("clipboard_copy_delay", 0.1)
-        mouse_speed = self.config.get("mouse_speed", 0.24)
+        delays = self.config["execution_delays"]
+        self.max_retries = self.config["max_retries"]
+        self.currency_block = self.config["currency_block_size"]
+        self.item_block = self.config["item_block_size"]
+        self.clipboard_copy_delay = delays["clipboard_copy_delay"]
+        self.hold_shift_currency = self.config["hold_shift_currency"]
+        self.telemetry_directory = self.config["telemetry_directory"]
+        self.item_cache.resize(self.config["item_cache_size"])
+        self.mouse.duration = delays["mouse_speed"]
         
         # Load item positions
         self.orb_of_scouring = self.stash_items_positions['main_currency'][8]['position']
@@ -31,17 +73,16 @@ class MagicCraftController:
         # Calculate currency center
         self.currency_block_center = [self.currency_block[0] / 2, self.currency_block[1] / 2]
         self.item_center = [item_position[0] + item_block_center[0], item_position[1] + item_block_center[1]]
-        
-        # Initialize controllers
-        self.keyboard = KeyboardController()
-        self.mouse = MouseController(self, mouse_speed) # mouse_speed
-        self.mod_parser = ModParser()
-        
-        # Stop loop logic
-        self.item_data = None
-        self.selected_mods = []
-        self.stop_loop = False
-        self.mouse.check_stop_loop(self.stop_key)
+
+        # Cache mouse paths between the fixed stash positions and the item
+        self.mouse.register_anchors(
+            [self.get_currency_center(currency['position']) for currency in self.stash_items_positions['main_currency']]
+            + [self.item_center]
+        )
+
+        if self.config["stop_key"] != self.stop_key:
+            self.stop_key = self.config["stop_key"]
+            self.mouse.check_stop_loop(self.stop_key)
         
         self.currency_names = {
             tuple(self.orb_of_scouring): "Orb of Scouring",
@@ -50,39 +91,141 @@ class MagicCraftController:
             tuple(self.orb_of_transmutation): "Orb of Transmutation",
         }
 
+    def on_config_changed(self, changed):
+        # May run on another controller's thread; the change is applied by our own loop
+        self._config_changed = True
+
+    def refresh_config(self):
+        """Pick up edited config files; called between rolls so a roll never sees a half-applied change."""
+        self.config_service.check_for_changes()
+        if self._config_changed:
+            self._config_changed = False
+            self.apply_config()
+
+    @property
+    def stop_loop(self):
+        return self.stop_event.is_set()
+
+    @stop_loop.setter
+    def stop_loop(self, value):
+        if value:
+            self.stop_event.set()
+        else:
+            self.stop_event.clear()
+
+    def report_progress(self, status, **data):
+        """Send a progress update to the registered callback (e.g. a worker's queue)."""
+        if self.progress_callback:
+            self.progress_callback({"status": status, **data})
+
     @staticmethod
     def load_items_positions():
-        with open("config/stash.json", "r") as file:
-            return json.load(file)
+        return get_config_service().stash
     
     @staticmethod
     def load_options():
-        try:
-            with open("config/options.json", "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print("Error: Options file not found. Using defaults.")
-            return {}
-
-    def check_item_mods(self):
-        # Copy the item text
-        item = self.keyboard.get_clipboard_data()
+        return get_config_service().options
+
+    def check_item_mods(self, previous_item=None):
+        # Copy the item text, waiting for it to differ from previous_item if given
+        with self.telemetry.stage("clipboard copy"):
+            item = self.keyboard.get_clipboard_data(previous_item)
         if not item:
             return None
         
-        item_mods = self.mod_parser.parse_mods(item)
-        item_rarity = self.mod_parser.get_item_rarity(item)
-        match_found = self.mod_parser.compare_mods(item_mods, self.selected_mods)
+        # Parse the item once; everything below works on the ParsedItem.
+        # A text seen before in this target set skips parse and match entirely.
+        cached = self.item_cache.get(item)
+        if cached is None:
+            with self.telemetry.stage("parse"):
+                parsed_item = self.mod_parser.parse_item(item)
+            with self.telemetry.stage("match"):
+                match_found = self.mod_parser.compare_mods(parsed_item, self.mod_matcher)
+            self.item_cache.put(item, parsed_item, match_found)
+        else:
+            parsed_item, match_found = cached
         
-        return { "item": item, "mods": item_mods, "rarity": item_rarity, "match_found": match_found }
+        return { "item": item, "parsed": parsed_item, "mods": parsed_item.mods, "rarity": parsed_item.rarity, "match_found": match_found }
 
     def start_magic_craft(self, selected_mods):
+        self.begin_session(selected_mods)
+        try:
+            return self.run_craft()
+        finally:
+            self.end_session()
+
+    def run_craft(self, item_center=None):
+        """Craft loop of this controller; the batch controller calls it for every cell."""
+        return self.run_magic_craft(item_center)
+
+    def set_mod_file(self, mod_file):
+        """Link rolled mods to the mod files of this base type (see ModParser.set_mod_file)."""
+        tables = self.mod_parser.mod_tables
+        self.mod_parser.set_mod_file(mod_file)
+        if self.mod_parser.mod_tables != tables:
+            self.item_cache.clear()  # Cached items were parsed against another base type
+
+    def begin_session(self, selected_mods):
+        """
+        Compile the targets and reset the stop flag and telemetry for a craft session.
+        selected_mods is a list of mods that must all match or a filter expression (see mod_filter).
+        """
+        if self.mouse.stop_subscription is None:
+            # Never spend currency without a working emergency stop
+            raise ValueError(f"Invalid stop key '{self.stop_key}'. Set a valid stop_key in config/options.json.")
         self.selected_mods = selected_mods
+        self.mod_matcher = self.mod_parser.compile_filter(selected_mods)
+        self.item_cache.set_targets(selected_mods)  # Cached matches are only valid for the same targets
+        self.item_cache.reset_stats()
         self.stop_loop = False
+        self.telemetry = RollTelemetry()
+
+    def end_session(self):
+        # Put back any currency held with Shift before handing control back
+        self.release_currency()
+        if self.item_cache.max_size:
+            stats = self.item_cache.stats()
+            print(f"Item cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}).")
+        self.export_telemetry()
+
+    def close(self):
+        """
+        Cancel the stop key and config subscriptions and release the clipboard backend;
+        the shared key listener stops when nothing uses it.
+        """
+        self.stop_loop = True
+        self.release_currency()
+        self.mouse.stop_listening()
+        self.unsubscribe_config()
+        self.keyboard.close()
+
+    def export_telemetry(self):
+        if not self.telemetry.rolls:
+            return
+        try:
+            csv_path, json_path = self.telemetry.export(self.telemetry_directory, {"item_cache": self.item_cache.stats()})
+            print(f"Roll telemetry saved to {csv_path} and {json_path}.")
+        except OSError as e:
+            print(f"Error saving roll telemetry: {e}")
+
+    def move_mouse(self, x, y):
+        with self.telemetry.stage("mouse move"):
+            self.mouse.move(x, y)
+
+    def click_mouse(self, button='left'):
+        with self.telemetry.stage("click"):
+            self.mouse.click(button=button)
+
+    def run_magic_craft(self, item_center=None):
+        """Craft the item at item_center (default: the item slot) until the selected mods match."""
+        follow_item_slot = item_center is None  # The slot may move with a stash.json reload
+        item_center = item_center or self.item_center
         retry_count = 0
+        self.item_data = None
+        self.report_progress("started", rolls=0, max_rolls=self.max_retries)
         
         # Start crafting loop
-        self.mouse.move(self.item_center[0], self.item_center[1])
+        self.move_mouse(item_center[0], item_center[1])
         
         self.item_data = self.check_item_mods()
         
@@ -90,32 +233,38 @@ class MagicCraftController:
             return False
 
         if self.item_data["rarity"] == "Normal":
-                self.apply_currency(self.orb_of_transmutation, self.item_center)
+                self.apply_currency(self.orb_of_transmutation, item_center)
                 
         if self.item_data["rarity"] == "Rare":
-            self.apply_currency(self.orb_of_scouring, self.item_center)
-            self.apply_currency(self.orb_of_transmutation, self.item_center)
+            self.apply_currency(self.orb_of_scouring, item_center)
+            self.apply_currency(self.orb_of_transmutation, item_center)
         
         while retry_count < self.max_retries and self.item_data and not self.stop_loop:
-            [open_affix, affix] = self.mod_parser.get_open_affixes(self.item_data["item"])
+            self.refresh_config()
+            if follow_item_slot:
+                item_center = self.item_center
+            [open_affix, affix] = self.mod_parser.get_open_affixes(self.item_data["parsed"])
 
             if self.item_data["match_found"]:
                 break
             
             # Dacă există un affix liber, aplicăm Orb of Augmentation
             if open_affix:
-                self.apply_currency(self.orb_of_augmentation, self.item_center)
+                self.apply_currency(self.orb_of_augmentation, item_center)
 
-                if self.item_data["match_found"]:
+                if self.item_data and self.item_data["match_found"]:
                     print('Crafting successful - mods match found.')
                     break
 
             # Dacă nu există affix liber, aplicăm Orb of Alteration și verificăm din nou
             else:
-                self.apply_currency(self.orb_of_alteration, self.item_center)
+                self.apply_currency(self.orb_of_alteration, item_center)
 
             retry_count += 1
             print(f"Retrying crafting... ({retry_count}/{self.max_retries})")
+            self.report_progress("rolling", rolls=retry_count, max_rolls=self.max_retries,
+                                 rolls_per_minute=self.telemetry.rolls_per_minute(),
+                                 slowest_stage=self.telemetry.slowest_stage())
 
         if self.item_data and self.item_data["match_found"]:
             print("Mods match! Crafting successful.")
@@ -149,15 +298,51 @@ class MagicCraftController:
         if self.stop_loop:
             return
         
-        currency_center = [currency_position[0] + self.currency_block_center[0], currency_position[1] + self.currency_block_center[1]]
-        
-        self.mouse.move(currency_center[0], currency_center[1])
-        self.mouse.right_click()
+        if self.hold_shift_currency:
+            self.apply_held_currency(currency_position, item_position)
+        else:
+            currency_center = self.get_currency_center(currency_position)
 
-        self.mouse.move(item_position[0], item_position[1])
-        self.mouse.click()
+            self.move_mouse(currency_center[0], currency_center[1])
+            self.click_mouse('right')
+
+            self.move_mouse(item_position[0], item_position[1])
+            self.click_mouse()
         
         currency_name = self.currency_names.get(tuple(currency_position), "Unknown Currency")
         print(f"Applied {currency_name} to item at position {item_position}.")
-        time.sleep(self.clipboard_copy_delay)  # Adjust the time if needed
-        self.item_data = self.check_item_mods()
+        previous_item = self.item_data["item"] if self.item_data else None
+        # The copy chord must go out without Shift: Ctrl+Shift+Alt+C does not copy the item
+        self.release_currency()
+        self.item_data = self.check_item_mods(previous_item)
+        self.telemetry.roll_completed()
+
+    def get_currency_center(self, currency_position):
+        return [currency_position[0] + self.currency_block_center[0], currency_position[1] + self.currency_block_center[1]]
+
+    def apply_held_currency(self, currency_position, item_position):
+        """
+        Shift-held mode: pick the currency up with Shift held and click the item. Shift is
+        released before the item is copied (see apply_currency), so the next roll picks the
+        currency up again.
+        """
+        if self.held_currency != tuple(currency_position):
+            self.release_currency()
+
+            currency_center = self.get_currency_center(currency_position)
+            self.move_mouse(currency_center[0], currency_center[1])
+            self.keyboard.hold_key('shift')
+            self.click_mouse('right')
+            self.held_currency = tuple(currency_position)
+
+            self.move_mouse(item_position[0], item_position[1])
+
+        self.click_mouse()
+
+    def release_currency(self):
+        """
+        Release Shift, which puts the held currency back into the stash.
+        """
+        if self.held_currency is not None:
+            self.keyboard.release_key('shift')
+            self.held_currency = None
@@ -0,0 +1,74 @@
+from controllers.craft_controllers.magic_craft_controller import MagicCraftController
+
+class RareCraftController(MagicCraftController):
+    """
+    Rerolls a rare item with Chaos Orbs until it satisfies a mod filter.
+
+    A normal item is made rare with an Orb of Alchemy first; a magic item is scoured before
+    that. Sessions, Shift-held currency, telemetry and the filter compiled by begin_session
+    are shared with MagicCraftController, so a rare roll costs one filter pass like a magic one.
+    """
+    def apply_config(self):
+        super().apply_config()
+        self.orb_of_alchemy = self.stash_items_positions['main_currency'][4]['position']
+        self.chaos_orb = self.stash_items_positions['main_currency'][5]['position']
+        self.currency_names[tuple(self.orb_of_alchemy)] = "Orb of Alchemy"
+        self.currency_names[tuple(self.chaos_orb)] = "Chaos Orb"
+
+    def start_rare_craft(self, mod_filter):
+        """Craft the item in the item slot until it matches `mod_filter` (an expression or a list of mods)."""
+        self.begin_session(mod_filter)
+        try:
+            return self.run_craft()
+        finally:
+            self.end_session()
+
+    def run_craft(self, item_center=None):
+        return self.run_rare_craft(item_center)
+
+    def run_rare_craft(self, item_center=None):
+        """Craft the item at item_center (default: the item slot) until the filter matches."""
+        follow_item_slot = item_center is None
+        item_center = item_center or self.item_center
+        retry_count = 0
+        self.item_data = None
+        self.report_progress("started", rolls=0, max_rolls=self.max_retries)
+
+        self.move_mouse(item_center[0], item_center[1])
+        self.item_data = self.check_item_mods()
+
+        if not self.item_data:
+            return False
+
+        if self.item_data["match_found"] and self.item_data["rarity"] == "Rare":
+            print("Mods match! Crafting successful.")
+            return True
+
+        if self.item_data["rarity"] == "Magic":
+            self.apply_currency(self.orb_of_scouring, item_center)
+
+        if self.item_data and self.item_data["rarity"] == "Normal":
+            self.apply_currency(self.orb_of_alchemy, item_center)
+
+        while retry_count < self.max_retries and self.item_data and not self.stop_loop:
+            self.refresh_config()
+            if follow_item_slot:
+                item_center = self.item_center
+
+            if self.item_data["match_found"] and self.item_data["rarity"] == "Rare":
+                break
+
+            self.apply_currency(self.chaos_orb, item_center)
+
+            retry_count += 1
+            print(f"Retrying crafting... ({retry_count}/{self.max_retries})")
+            self.report_progress("rolling", rolls=retry_count, max_rolls=self.max_retries,
+                                 rolls_per_minute=self.telemetry.rolls_per_minute(),
+                                 slowest_stage=self.telemetry.slowest_stage())
+
+        if self.item_data and self.item_data["match_found"] and self.item_data["rarity"] == "Rare":
+            print("Mods match! Crafting successful.")
+            return True
+
+        print("Max retries reached or no matching mods found.")
+        return False
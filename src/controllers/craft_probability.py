@@ -0,0 +1,98 @@
+from controllers.affix_pool import MAGIC_TWO_AFFIX_CHANCE, build_affix_pools
+
+
+class CraftOdds:
+    """
+    Exact odds of hitting the selected mods with the magic craft loop
+    (alteration, then augmentation when the alteration left an open affix).
+    """
+    def __init__(self, alteration_chance, augmentation_used, augmentation_success):
+        self.alteration_chance = alteration_chance  # Alteration alone hits the targets
+        self.augmentation_used = augmentation_used  # Alteration left one affix and missed
+        self.augmentation_success = augmentation_success  # ... and the augmentation then hit
+        self.augmentation_chance = augmentation_success / augmentation_used if augmentation_used else 0.0
+        self.attempt_chance = alteration_chance + augmentation_success
+        self.rolls_per_attempt = 1 + augmentation_used
+        self.expected_rolls = self.rolls_per_attempt / self.attempt_chance if self.attempt_chance else float("inf")
+
+    def chance_within(self, rolls):
+        """
+        Probability of hitting the targets within `rolls` currency applications,
+        counted like MagicCraftController's max_retries.
+        """
+        fresh, open_affix, hit = 1.0, 0.0, 0.0
+        alteration_miss = 1.0 - self.alteration_chance - self.augmentation_used
+        for _ in range(rolls):
+            hit += fresh * self.alteration_chance + open_affix * self.augmentation_chance
+            fresh, open_affix = (fresh * alteration_miss + open_affix * (1.0 - self.augmentation_chance),
+                                 fresh * self.augmentation_used)
+        return hit
+
+    def __repr__(self):
+        return (f"CraftOdds(alteration={self.alteration_chance:.5f}, augmentation={self.augmentation_chance:.5f}, "
+                f"expected_rolls={self.expected_rolls:.1f})")
+
+
+class CraftProbability:
+    """
+    Exact odds calculator over the loaded mod tables, memoized on (file, item level, target set).
+    """
+    def __init__(self, mod_database, two_affix_chance=MAGIC_TWO_AFFIX_CHANCE):
+        self.mod_database = mod_database
+        self.two_affix_chance = two_affix_chance
+        self._cache = {}
+
+    def clear(self):
+        self._cache.clear()
+
+    def odds(self, filename, item_level, selected_mods):
+        key = (filename, item_level, frozenset(selected_mods))
+        odds = self._cache.get(key)
+        if odds is None:
+            odds = self._compute(filename, item_level, sorted(key[2]))
+            self._cache[key] = odds
+        return odds
+
+    @staticmethod
+    def _mask_distribution(pool):
+        # Rows that satisfy the same targets are interchangeable; sum their probability
+        if not pool.total_weight:
+            return {0: 1.0}  # A missing or empty table rolls nothing: a certain miss, not an impossible pair
+        distribution = {}
+        for weight, mask in zip(pool.weights, pool.target_masks):
+            distribution[mask] = distribution.get(mask, 0.0) + weight / pool.total_weight
+        return distribution
+
+    def _compute(self, filename, item_level, selected_mods):
+        prefix_pool, suffix_pool, full_mask = build_affix_pools(self.mod_database, filename, item_level, selected_mods)
+        total_weight = prefix_pool.total_weight + suffix_pool.total_weight
+        if not full_mask:
+            return CraftOdds(1.0, 0.0, 0.0)
+        if not total_weight:
+            return CraftOdds(0.0, 0.0, 0.0)
+
+        prefixes = self._mask_distribution(prefix_pool)
+        suffixes = self._mask_distribution(suffix_pool)
+        prefix_hit = prefixes.get(full_mask, 0.0)
+        suffix_hit = suffixes.get(full_mask, 0.0)
+        # Probability that a prefix and a suffix together satisfy every target
+        pair_hit = sum(prefix_chance * suffix_chance
+                       for prefix_mask, prefix_chance in prefixes.items()
+                       for suffix_mask, suffix_chance in suffixes.items()
+                       if prefix_mask | suffix_mask == full_mask)
+
+        two = self.two_affix_chance
+        prefix_only = (1.0 - two) * prefix_pool.total_weight / total_weight
+        suffix_only = (1.0 - two) * suffix_pool.total_weight / total_weight
+
+        alteration_chance = two * pair_hit + prefix_only * prefix_hit + suffix_only * suffix_hit
+        # A missed single-affix alteration is followed by an augmentation on the open side;
+        # pair_hit already includes the cases where the first affix alone was a hit
+        augmentation_used = (prefix_only * (1.0 - prefix_hit) if suffix_pool.total_weight else 0.0) \
+            + (suffix_only * (1.0 - suffix_hit) if prefix_pool.total_weight else 0.0)
+        augmentation_success = 0.0
+        if suffix_pool.total_weight:
+            augmentation_success += prefix_only * (pair_hit - prefix_hit)
+        if prefix_pool.total_weight:
+            augmentation_success += suffix_only * (pair_hit - suffix_hit)
+        return CraftOdds(alteration_chance, augmentation_used, augmentation_success)
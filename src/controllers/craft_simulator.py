@@ -0,0 +1,101 @@
+import numpy as np
+from controllers.affix_pool import MAGIC_TWO_AFFIX_CHANCE, build_affix_pools
+
+
+class SimulationResult:
+    """
+    Distribution of currency needed to hit the selected mods, over simulated sessions.
+    """
+    def __init__(self, attempts, session_rolls, alterations, augmentations):
+        self.attempts = attempts
+        self.sessions = len(session_rolls)
+        self.success_rate = self.sessions / attempts if attempts else 0.0
+        if self.sessions:
+            self.mean_rolls = float(session_rolls.mean())
+            self.p50, self.p90, self.p99 = (float(value) for value in np.percentile(session_rolls, (50, 90, 99)))
+        else:
+            self.mean_rolls = self.p50 = self.p90 = self.p99 = float("inf")
+        self.alterations_per_attempt = alterations / attempts if attempts else 0.0
+        self.augmentations_per_attempt = augmentations / attempts if attempts else 0.0
+
+    def __repr__(self):
+        return (f"SimulationResult(sessions={self.sessions}, mean={self.mean_rolls:.1f}, "
+                f"p50={self.p50:.0f}, p90={self.p90:.0f}, p99={self.p99:.0f})")
+
+
+class CraftSimulator:
+    """
+    Vectorized Monte Carlo model of the magic craft loop: alteration, then augmentation when
+    the alteration left an open affix. Affixes are sampled by Weight from the rows that can
+    roll at the item level. A session ends when every selected mod is present.
+    """
+    def __init__(self, mod_database, filename, item_level, selected_mods, two_affix_chance=MAGIC_TWO_AFFIX_CHANCE, seed=None):
+        prefix_pool, suffix_pool, self.full_mask = build_affix_pools(mod_database, filename, item_level, selected_mods)
+        if self.full_mask.bit_length() > 63:
+            raise ValueError("The simulator supports at most 63 selected mods.")
+
+        self.two_affix_chance = two_affix_chance
+        self.rng = np.random.default_rng(seed)
+        self.prefix_weight = prefix_pool.total_weight
+        self.suffix_weight = suffix_pool.total_weight
+        self.prefix_cumulative = np.cumsum(np.asarray(prefix_pool.weights, dtype=np.float64))
+        self.suffix_cumulative = np.cumsum(np.asarray(suffix_pool.weights, dtype=np.float64))
+        self.prefix_masks = np.asarray(prefix_pool.target_masks, dtype=np.int64)
+        self.suffix_masks = np.asarray(suffix_pool.target_masks, dtype=np.int64)
+
+    def _sample(self, cumulative, masks, total, size):
+        if not len(masks):
+            return np.zeros(size, dtype=np.int64)
+        rows = np.searchsorted(cumulative, self.rng.random(size) * total, side='right')
+        return masks[np.minimum(rows, len(masks) - 1)]
+
+    def simulate_attempts(self, size):
+        """
+        Simulates `size` alteration attempts. Returns (cost in currency, success) arrays.
+        """
+        total = self.prefix_weight + self.suffix_weight
+        if total <= 0:
+            return np.ones(size, dtype=np.int64), np.zeros(size, dtype=bool)
+
+        two_affixes = self.rng.random(size) < self.two_affix_chance
+        prefix_only = self.rng.random(size) * total < self.prefix_weight
+        prefix_masks = self._sample(self.prefix_cumulative, self.prefix_masks, self.prefix_weight, size)
+        suffix_masks = self._sample(self.suffix_cumulative, self.suffix_masks, self.suffix_weight, size)
+
+        has_prefix = two_affixes | prefix_only
+        has_suffix = two_affixes | ~prefix_only
+        alteration_masks = np.where(has_prefix, prefix_masks, 0) | np.where(has_suffix, suffix_masks, 0)
+        alteration_hit = alteration_masks == self.full_mask
+
+        # One affix and no hit: an augmentation fills the open side
+        augmented = ~two_affixes & ~alteration_hit
+        success = alteration_hit | (augmented & ((prefix_masks | suffix_masks) == self.full_mask))
+        return 1 + augmented, success
+
+    def simulate(self, attempts=1_000_000, batch_size=250_000):
+        """
+        Runs `attempts` attempts in batches and splits them into sessions at each success.
+        """
+        session_rolls = []
+        carried = 0  # Rolls of the session still running at the end of a batch
+        alterations = augmentations = 0
+
+        for start in range(0, attempts, batch_size):
+            size = min(batch_size, attempts - start)
+            costs, success = self.simulate_attempts(size)
+            alterations += size
+            augmentations += int(costs.sum()) - size
+
+            cumulative = np.cumsum(costs)
+            ends = np.flatnonzero(success)
+            if len(ends):
+                totals = cumulative[ends]
+                rolls = np.diff(totals, prepend=0)
+                rolls[0] += carried
+                session_rolls.append(rolls)
+                carried = int(cumulative[-1] - totals[-1])
+            else:
+                carried += int(cumulative[-1])
+
+        rolls = np.concatenate(session_rolls) if session_rolls else np.empty(0, dtype=np.int64)
+        return SimulationResult(attempts, rolls, alterations, augmentations)
@@ -1,11 +1,37 @@
 import os
 import csv
+import json
+import struct
+from array import array
+
+# Numeric columns of the mod files; every column ending in '%' is stored as a float
+INT_COLUMNS = ("Tier", "iLvl", "Weight")
+
+# Binary sidecar cache layout (little endian):
+#   header: magic, version, source mtime_ns, source size, column count
+#   column: name length + utf-8 name, kind ('i', 'd' or 's'), row count, then
+#           'i'/'d': the raw array, 's': row count + 1 uint32 byte offsets and the utf-8 blob
+CACHE_DIRECTORY = ".cache"
+CACHE_MAGIC = b"LPMC"
+CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sHqqI")
+_COLUMN_HEADER = struct.Struct("<cI")
+_NAME_LENGTH = struct.Struct("<H")
+_BLOB_LENGTH = struct.Struct("<I")
 
 class FileManager:
     def __init__(self, directory="mod_files"):
         self.directory = directory
         if not os.path.exists(directory):
             os.makedirs(directory)
+
+        self.cache_directory = os.path.join(directory, CACHE_DIRECTORY)
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating mod cache directory: {e}")
+        self.manifest_path = os.path.join(self.cache_directory, "manifest.json")
+        self._manifest = None
     
     def load_mods_from_file(self, filename):
         filepath = os.path.join(self.directory, filename)
@@ -19,6 +45,48 @@ class FileManager:
                 mods.append(row)
         return mods
     
+    def load_mod_columns(self, filename):
+        """
+        Loads a mod file into typed columns: int arrays for Tier/iLvl/Weight, float arrays
+        for the percent columns and lists of strings for everything else.
+        The columns come from the binary cache unless the CSV changed since it was written.
+        """
+        filepath = os.path.join(self.directory, filename)
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File {filename} not found in {self.directory}")
+
+        cache_path = os.path.join(self.cache_directory, filename + ".bin")
+        columns = self._read_cache(cache_path, stat)
+        if columns is None:
+            columns = self._parse_mod_columns(filepath)
+            self._write_cache(cache_path, stat, columns)
+        return columns
+
+    def _parse_mod_columns(self, filepath):
+        with open(filepath, 'r', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            fieldnames = next(reader, [])
+            rows = [row for row in reader if row]
+
+        columns = {}
+        for index, field in enumerate(fieldnames):
+            values = [row[index] if index < len(row) else "" for row in rows]
+            if field in INT_COLUMNS or field.endswith('%'):
+                # Typed arrays have no "missing"; report empty cells instead of passing them off as 0
+                empty_rows = [row + 2 for row, value in enumerate(values) if not value.strip()]
+                if empty_rows:
+                    listed = ", ".join(map(str, empty_rows[:10])) + (", ..." if len(empty_rows) > 10 else "")
+                    print(f"Warning: {os.path.basename(filepath)} has empty {field} cells on line(s) {listed}; they are read as 0.")
+            if field in INT_COLUMNS:
+                columns[field] = array('i', (int(value) if value.strip() else 0 for value in values))
+            elif field.endswith('%'):
+                columns[field] = array('d', (float(value.strip().rstrip('%')) if value.strip() else 0.0 for value in values))
+            else:
+                columns[field] = values
+        return columns
+
     def save_mods_to_file(self, filename, mod_data):
         filepath = os.path.join(self.directory, filename)
         with open(filepath, 'w', encoding='utf-8', newline='') as file:
@@ -28,5 +96,114 @@ class FileManager:
             for mod in mod_data:
                 writer.writerow(mod)
     
+    def _read_cache(self, cache_path, stat):
+        try:
+            with open(cache_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version, mtime_ns, size, column_count = _CACHE_HEADER.unpack_from(data, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                return None
+            if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+                return None
+
+            view = memoryview(data)
+            offset = _CACHE_HEADER.size
+            columns = {}
+            row_count = None
+
+            def take(length):
+                # A truncated file must not load as a shorter table
+                if offset + length > len(data):
+                    raise ValueError("truncated cache")
+                return view[offset:offset + length]
+
+            for _ in range(column_count):
+                (name_length,) = _NAME_LENGTH.unpack_from(data, offset)
+                offset += _NAME_LENGTH.size
+                name = bytes(view[offset:offset + name_length]).decode('utf-8')
+                offset += name_length
+                kind, count = _COLUMN_HEADER.unpack_from(data, offset)
+                offset += _COLUMN_HEADER.size
+                if row_count is None:
+                    row_count = count
+                elif count != row_count:
+                    return None
+
+                if kind == b's':
+                    offsets = array('I')
+                    offsets.frombytes(take((count + 1) * offsets.itemsize))
+                    offset += (count + 1) * offsets.itemsize
+                    blob = bytes(take(offsets[-1]))
+                    offset += offsets[-1]
+                    columns[name] = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+                else:
+                    values = array(kind.decode('ascii'))
+                    values.frombytes(take(count * values.itemsize))
+                    offset += count * values.itemsize
+                    columns[name] = values
+            if offset != len(data):
+                return None
+            return columns
+        except (struct.error, ValueError, IndexError):
+            return None
+
+    def _write_cache(self, cache_path, stat, columns):
+        chunks = [_CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, stat.st_mtime_ns, stat.st_size, len(columns))]
+        for name, values in columns.items():
+            encoded_name = name.encode('utf-8')
+            chunks.append(_NAME_LENGTH.pack(len(encoded_name)))
+            chunks.append(encoded_name)
+            if isinstance(values, array):
+                chunks.append(_COLUMN_HEADER.pack(values.typecode.encode('ascii'), len(values)))
+                chunks.append(values.tobytes())
+            else:
+                encoded = [value.encode('utf-8') for value in values]
+                offsets = array('I', [0])
+                for value in encoded:
+                    offsets.append(offsets[-1] + len(value))
+                chunks.append(_COLUMN_HEADER.pack(b's', len(values)))
+                chunks.append(offsets.tobytes())
+                chunks.append(b"".join(encoded))
+
+        temp_path = cache_path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(b"".join(chunks))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Error writing mod cache {cache_path}: {e}")
+
     def list_files(self):
-        return [f for f in os.listdir(self.directory) if f.endswith(".csv")]
+        """
+        Returns the CSV files in the directory from a manifest that is refreshed
+        only when the directory's mtime changes.
+        """
+        try:
+            directory_mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        if self._manifest is None:
+            self._manifest = self._read_manifest()
+        if self._manifest and self._manifest.get("directory_mtime_ns") == directory_mtime:
+            return sorted(self._manifest["files"])
+
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".csv"))
+        self._manifest = {"directory_mtime_ns": directory_mtime, "files": files}
+        try:
+            with open(self.manifest_path, 'w', encoding='utf-8') as file:
+                json.dump(self._manifest, file)
+        except OSError as e:
+            print(f"Error writing mod manifest: {e}")
+        return list(files)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
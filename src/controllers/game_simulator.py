@@ -0,0 +1,299 @@
+import random
+import re
+from controllers.clipboard_backends import FakeClipboardBackend
+from controllers.input_backends import InputBackend
+
+# Hybrid mods are stored as one "A, B" row but shown by the game as one line per part
+_HYBRID_SPLIT_RE = re.compile(r", (?=[+(\d-])")
+_RANGE_RE = re.compile(r"\((\d+)-(\d+)\)")
+
+CURRENCY_NAMES = {
+    "orb_of_scouring": "scouring",
+    "transmutation_orb": "transmutation",
+    "augmentation_orb": "augmentation",
+    "alteration_orb": "alteration",
+    "alchemy_orb": "alchemy",
+    "chaos_orb": "chaos",
+}
+
+# Number of affixes rolled by an Orb of Alchemy or Chaos Orb, with their relative weights
+RARE_AFFIX_COUNT_WEIGHTS = {4: 8, 5: 3, 6: 1}
+
+
+class SimulatedInputBackend(InputBackend):
+    """
+    Input backend that forwards mouse and key events to a SimulatedGame.
+    """
+    name = "simulated"
+
+    def __init__(self, game):
+        self.game = game
+        self.cursor = (0, 0)
+        self.pressed = set()
+        self.listeners = []  # (on_press, on_release) pairs; they see every key event, as an OS hook would
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y):
+        self.cursor = (x, y)
+
+    def click(self, button='left'):
+        self.game.on_click(button, self.cursor, 'shift' in self.pressed)
+
+    def scroll(self, clicks):
+        pass
+
+    def key_down(self, key):
+        self.pressed.add(key)
+        # With Shift also down the chord is Ctrl+Shift+Alt+C, which does not copy the item
+        if key == 'c' and 'ctrl' in self.pressed and 'alt' in self.pressed and 'shift' not in self.pressed:
+            self.game.on_copy(self.cursor)
+        for on_press, _ in list(self.listeners):
+            if on_press:
+                on_press(key)
+
+    def key_up(self, key):
+        self.pressed.discard(key)
+        if key == 'shift':
+            self.game.on_shift_released()
+        for _, on_release in list(self.listeners):
+            if on_release:
+                on_release(key)
+
+    def start_listener(self, on_press=None, on_release=None):
+        callbacks = (on_press, on_release)
+        self.listeners.append(callbacks)
+        return SimulatedListener(self.listeners, callbacks)
+
+
+class SimulatedListener:
+    def __init__(self, listeners, callbacks):
+        self.listeners = listeners
+        self.callbacks = callbacks
+
+    def stop(self):
+        if self.callbacks in self.listeners:
+            self.listeners.remove(self.callbacks)
+
+
+class SimulatedItem:
+    """
+    A jewel in one stash slot: rarity and rolled (table, row, values) affixes, where values
+    are the numbers rolled for the row's (min-max) ranges. Values are rolled once with the
+    affix, so copying an unchanged item gives the same text.
+    """
+    def __init__(self, rarity="Normal", prefixes=(), suffixes=()):
+        self.rarity = rarity
+        self.affixes = {"prefix": list(prefixes), "suffix": list(suffixes)}
+
+
+class SimulatedGame:
+    """
+    Headless stand-in for the game client: a jewel in the stash item slot (and in each cell
+    of "item_grid" if configured), the currency slots from stash.json and a clipboard that
+    receives the hovered item's text on Ctrl+Alt+C.
+
+    Affixes are rolled by the Weight column of the mod tables of `mod_file`'s base type (all
+    loaded tables if None), limited to rows whose iLvl does not exceed the item level, and
+    reported in the advanced copy format parsed by ModParser.
+    """
+    def __init__(self, mod_database, stash_positions, currency_block_size=(42, 42), item_block_size=(84, 166),
+                 item_level=84, two_affix_chance=0.5, seed=None, mod_file=None):
+        self.random = random.Random(seed)
+        self.item_level = item_level
+        self.two_affix_chance = two_affix_chance
+
+        self.clipboard = FakeClipboardBackend()
+        self.input = SimulatedInputBackend(self)
+
+        base_tables = mod_database.base_tables(mod_file) if mod_file else None
+        self.pools = {}
+        for affix_type in ("prefix", "suffix"):
+            rows = []
+            for filename, row in mod_database.rows_for_affix_type(affix_type):
+                if base_tables is not None and filename not in base_tables:
+                    continue
+                table = mod_database.get_table(filename)
+                if table.item_levels[row] <= item_level and table.weights[row] > 0:
+                    rows.append((table, row))
+            self.pools[affix_type] = (rows, [table.weights[row] for table, row in rows])
+        # A rare item rolls each mod once, so a type offers at most this many affixes
+        self.template_counts = {affix_type: len({table.templates[row] for table, row in rows})
+                                for affix_type, (rows, _) in self.pools.items()}
+
+        self.currency_slots = []
+        for currency in stash_positions["main_currency"]:
+            name = CURRENCY_NAMES.get(currency["name"], currency["name"])
+            self.currency_slots.append((name, self._rect(currency["position"], currency_block_size)))
+        self.item_rect = self._rect(stash_positions["item_slot"]["position"], item_block_size)
+        self.items = {self.item_rect: SimulatedItem()}
+        grid = stash_positions.get("item_grid")
+        if grid:
+            cell_width, cell_height = grid.get("cell_size", item_block_size)
+            for row in range(grid["rows"]):
+                for column in range(grid["columns"]):
+                    position = (grid["position"][0] + column * cell_width, grid["position"][1] + row * cell_height)
+                    self.items[self._rect(position, (cell_width, cell_height))] = SimulatedItem()
+
+        self.item = self.items[self.item_rect]  # Item the current currency or copy applies to
+        self.held_currency = None
+        self.currency_used = {}
+        self.copies = 0
+
+    @staticmethod
+    def _rect(position, size):
+        return (position[0], position[1], position[0] + size[0], position[1] + size[1])
+
+    @staticmethod
+    def _inside(rect, point):
+        return rect[0] <= point[0] <= rect[2] and rect[1] <= point[1] <= rect[3]
+
+    def item_at(self, cursor):
+        for rect, item in self.items.items():
+            if self._inside(rect, cursor):
+                return item
+        return None
+
+    def set_item(self, rarity="Normal", prefixes=(), suffixes=(), rect=None):
+        """Puts an item with the given (table, row) affixes in the item slot (or the slot at `rect`)."""
+        self.items[rect or self.item_rect] = SimulatedItem(
+            rarity, [self._roll_values(table, row) for table, row in prefixes],
+            [self._roll_values(table, row) for table, row in suffixes])
+
+    # Input events
+    def on_click(self, button, cursor, shift_held):
+        if button == 'right':
+            for name, rect in self.currency_slots:
+                if self._inside(rect, cursor):
+                    self.held_currency = name
+                    return
+        elif button == 'left' and self.held_currency:
+            item = self.item_at(cursor)
+            if item is not None:
+                self.item = item
+                self.apply_currency(self.held_currency)
+                if not shift_held:
+                    self.held_currency = None
+
+    def on_shift_released(self):
+        self.held_currency = None
+
+    def on_copy(self, cursor):
+        item = self.item_at(cursor)
+        if item is not None:
+            self.item = item
+            self.copies += 1
+            self.clipboard.copy(self.item_text())
+
+    # Crafting rules
+    def apply_currency(self, name):
+        applied = False
+        if name == "transmutation" and self.item.rarity == "Normal":
+            self.item.rarity = "Magic"
+            self.roll_magic()
+            applied = True
+        elif name == "alteration" and self.item.rarity == "Magic":
+            self.roll_magic()
+            applied = True
+        elif name == "augmentation" and self.item.rarity == "Magic":
+            affix_type = self._pick_affix_type([affix_type for affix_type, rolled in self.item.affixes.items() if not rolled])
+            if affix_type is not None:
+                self.item.affixes[affix_type].append(self._roll_affix(affix_type))
+                applied = True
+        elif name == "alchemy" and self.item.rarity == "Normal":
+            self.item.rarity = "Rare"
+            self.roll_rare()
+            applied = True
+        elif name == "chaos" and self.item.rarity == "Rare":
+            self.roll_rare()
+            applied = True
+        elif name == "scouring" and self.item.rarity in ("Magic", "Rare"):
+            self.item.rarity = "Normal"
+            self.item.affixes = {"prefix": [], "suffix": []}
+            applied = True
+
+        if applied:
+            self.currency_used[name] = self.currency_used.get(name, 0) + 1
+        return applied
+
+    def roll_magic(self):
+        self.item.affixes = {"prefix": [], "suffix": []}
+        available = [affix_type for affix_type, (rows, _) in self.pools.items() if rows]
+        if len(available) == 2 and self.random.random() < self.two_affix_chance:
+            affix_types = available
+        else:
+            # A base type without rows of one type always rolls the other one
+            affix_type = self._pick_affix_type(available)
+            affix_types = (affix_type,) if affix_type is not None else ()
+        for affix_type in affix_types:
+            self.item.affixes[affix_type].append(self._roll_affix(affix_type))
+
+    def roll_rare(self):
+        """Rolls 4-6 affixes, at most 3 of each type and no mod twice (fewer if the pools run out)."""
+        self.item.affixes = {"prefix": [], "suffix": []}
+        counts = list(RARE_AFFIX_COUNT_WEIGHTS)
+        affix_count = self.random.choices(counts, weights=[RARE_AFFIX_COUNT_WEIGHTS[n] for n in counts])[0]
+        affix_count = min(affix_count, sum(min(3, count) for count in self.template_counts.values()))
+        rolled = set()
+        for _ in range(affix_count):
+            open_types = [affix_type for affix_type, affixes in self.item.affixes.items()
+                          if len(affixes) < 3 and self._has_candidates(affix_type, rolled)]
+            affix_type = self._pick_affix_type(open_types)
+            if affix_type is None:
+                break
+            affix = self._roll_affix(affix_type, rolled)
+            rolled.add(affix[0].templates[affix[1]])  # One tier per mod
+            self.item.affixes[affix_type].append(affix)
+
+    def _has_candidates(self, affix_type, rolled):
+        return any(table.templates[row] not in rolled for table, row in self.pools[affix_type][0])
+
+    def _pick_affix_type(self, affix_types=("prefix", "suffix")):
+        """One of affix_types by the total weight of their pools, or None if all are empty."""
+        weights = [sum(self.pools[affix_type][1]) for affix_type in affix_types]
+        total = sum(weights)
+        if not total:
+            return None
+        pick = self.random.random() * total
+        for affix_type, weight in zip(affix_types, weights):
+            if pick < weight:
+                return affix_type
+            pick -= weight
+        return affix_types[-1]
+
+    def _roll_affix(self, affix_type, excluded_templates=()):
+        """A (table, row, values) affix of the type, skipping mods in excluded_templates."""
+        rows, weights = self.pools[affix_type]
+        if excluded_templates:
+            candidates = [(entry, weight) for entry, weight in zip(rows, weights)
+                          if entry[0].templates[entry[1]] not in excluded_templates]
+            rows = [entry for entry, _ in candidates]
+            weights = [weight for _, weight in candidates]
+        table, row = self.random.choices(rows, weights=weights)[0]
+        return self._roll_values(table, row)
+
+    def _roll_values(self, table, row):
+        values = tuple(self.random.randint(int(low), int(high)) for low, high in _RANGE_RE.findall(table.mods[row]))
+        return table, row, values
+
+    # Clipboard text
+    @staticmethod
+    def _render_line(line, values):
+        """The mod line with the next rolled value in front of each (min-max) range."""
+        return _RANGE_RE.sub(lambda match: f"{next(values)}({match.group(1)}-{match.group(2)})", line)
+
+    def item_text(self):
+        name = "Cobalt Jewel"
+        lines = ["Item Class: Jewels", f"Rarity: {self.item.rarity}", name, "--------",
+                 f"Item Level: {self.item_level}", "--------"]
+        for affix_type in ("prefix", "suffix"):
+            for table, row, values in self.item.affixes[affix_type]:
+                tag = table.tags[row]
+                tags = f" — {tag}" if tag else ""
+                lines.append(f'{{ {affix_type.capitalize()} Modifier "" (Tier: {table.tiers[row]}){tags} }}')
+                values = iter(values)
+                lines.extend(self._render_line(part, values) for part in _HYBRID_SPLIT_RE.split(table.mods[row]))
+        lines.append("--------")
+        lines.append("Place into an allocated Jewel Socket on the Passive Skill Tree. Right click to remove from the Socket.")
+        return "\n".join(lines)
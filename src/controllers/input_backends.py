@@ -0,0 +1,114 @@
+class InputBackend:
+    """
+    Mouse and keyboard primitives used by KeyboardController and MouseController.
+    Keys are given by name ('ctrl', 'alt', 'shift', 'f3', 'c').
+    """
+    name = "base"
+
+    def position(self):
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        raise NotImplementedError
+
+    def click(self, button='left'):
+        raise NotImplementedError
+
+    def scroll(self, clicks):
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def start_listener(self, on_press=None, on_release=None):
+        """Start delivering OS key events to the callbacks. Returns an object with stop()."""
+        return NullListener()
+
+    def key_name(self, key):
+        """Name of a key object received by a listener callback."""
+        return key
+
+    def validate_key(self, key):
+        """Returns the key name if this backend knows the key; raises ValueError otherwise."""
+        return key
+
+
+class NullListener:
+    def stop(self):
+        pass
+
+
+class DesktopInputBackend(InputBackend):
+    """
+    Real input through pyautogui (mouse) and pynput (keyboard and key listener).
+    """
+    name = "desktop"
+
+    def __init__(self):
+        import pyautogui
+        from pynput.keyboard import Controller, Key, KeyCode, Listener
+
+        self._pyautogui = pyautogui
+        self._pyautogui.PAUSE = 0  # Dezactivare pauză implicită între mișcări
+        self._keyboard = Controller()
+        self._key = Key
+        self._key_code = KeyCode
+        self._listener_class = Listener
+
+    def _resolve(self, key):
+        if isinstance(key, str) and len(key) > 1:
+            return self._key[key]
+        return key
+
+    def position(self):
+        return self._pyautogui.position()
+
+    def move_to(self, x, y):
+        self._pyautogui.moveTo(x, y)
+
+    def click(self, button='left'):
+        self._pyautogui.click(button=button, duration=0.1)
+
+    def scroll(self, clicks):
+        self._pyautogui.scroll(clicks)
+
+    def key_down(self, key):
+        self._keyboard.press(self._resolve(key))
+
+    def key_up(self, key):
+        self._keyboard.release(self._resolve(key))
+
+    def start_listener(self, on_press=None, on_release=None):
+        listener = self._listener_class(on_press=on_press, on_release=on_release)
+        listener.start()
+        return listener
+
+    def validate_key(self, key):
+        try:
+            self._resolve(key)
+        except KeyError:
+            raise ValueError(f"Unknown key '{key}'.") from None
+        return key
+
+    def key_name(self, key):
+        if isinstance(key, self._key):
+            return key.name
+        if isinstance(key, self._key_code):
+            return key.char
+        return key
+
+
+_desktop_backend = None
+
+
+def create_input_backend(name="desktop"):
+    """Returns the input backend by name; the desktop backend is shared by the whole process."""
+    global _desktop_backend
+    if name == DesktopInputBackend.name:
+        if _desktop_backend is None:
+            _desktop_backend = DesktopInputBackend()
+        return _desktop_backend
+    raise ValueError(f"Unknown input backend '{name}'.")
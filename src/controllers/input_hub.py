@@ -0,0 +1,113 @@
+import threading
+import weakref
+
+# One hub per input backend, so every controller of the process shares its listener thread
+_HUBS = weakref.WeakKeyDictionary()
+_HUBS_LOCK = threading.Lock()
+
+
+def get_input_hub(input_backend):
+    """Returns the process-wide InputHub of an input backend, creating it on first use."""
+    with _HUBS_LOCK:
+        hub = _HUBS.get(input_backend)
+        if hub is None:
+            hub = _HUBS[input_backend] = InputHub(input_backend)
+        return hub
+
+
+class Subscription:
+    """
+    A callback registered with an InputHub for one key (or every key when key is None).
+    """
+    def __init__(self, hub, key, event, callback):
+        self.hub = hub
+        self.key = key
+        self.event = event
+        self.callback = callback
+        self.active = True
+
+    def cancel(self):
+        """Remove the callback; the hub stops its listener once nothing is subscribed."""
+        if self.active:
+            self.active = False
+            self.hub.unsubscribe(self)
+
+
+class InputHub:
+    """
+    Owns the single OS key listener of an input backend and dispatches its events.
+
+    Subscribers register per-key callbacks for "press" or "release". Callbacks are kept in
+    dicts keyed by key name and replaced copy-on-write, so an event costs one key_name()
+    and one dict lookup on the listener thread without taking a lock. The listener starts
+    with the first subscription and stops when the last one is cancelled. Callbacks run on
+    the listener thread and receive the key name.
+    """
+    EVENTS = ("press", "release")
+
+    def __init__(self, input_backend):
+        self.input = input_backend
+        self.listener = None
+        self.pressed_keys = set()  # Key names held down while the listener runs
+        self._lock = threading.Lock()
+        self._callbacks = {event: {} for event in self.EVENTS}  # event -> key name (None = any) -> callbacks
+        self._subscriptions = 0
+
+    def subscribe(self, key, callback, event="press"):
+        """
+        Call `callback(key_name)` on every `event` of `key` (a key name such as 'f3',
+        or None for every key). Returns a Subscription; cancel it to unsubscribe.
+        Raises ValueError for a key name the input backend does not know.
+        """
+        if event not in self.EVENTS:
+            raise ValueError(f"Unknown key event '{event}'.")
+        if key is not None:
+            self.input.validate_key(key)
+        subscription = Subscription(self, key, event, callback)
+        with self._lock:
+            callbacks = dict(self._callbacks[event])
+            callbacks[key] = callbacks.get(key, ()) + (subscription,)
+            self._callbacks[event] = callbacks
+            self._subscriptions += 1
+            if self.listener is None:
+                self.listener = self.input.start_listener(on_press=self._on_press, on_release=self._on_release)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            callbacks = dict(self._callbacks[subscription.event])
+            remaining = tuple(s for s in callbacks.get(subscription.key, ()) if s is not subscription)
+            if remaining:
+                callbacks[subscription.key] = remaining
+            else:
+                callbacks.pop(subscription.key, None)
+            self._callbacks[subscription.event] = callbacks
+            self._subscriptions -= 1
+            listener = None
+            if not self._subscriptions:
+                listener, self.listener = self.listener, None
+                self.pressed_keys.clear()
+        if listener is not None:
+            listener.stop()
+
+    def is_pressed(self, key):
+        """True if the key is held down (only tracked while something is subscribed)."""
+        return key in self.pressed_keys
+
+    def _dispatch(self, event, name):
+        callbacks = self._callbacks[event]
+        for subscription in callbacks.get(name, ()) + callbacks.get(None, ()):
+            try:
+                subscription.callback(name)
+            except Exception as e:
+                print(f"Error in {event} handler for key {name}: {e}")
+
+    def _on_press(self, key):
+        name = self.input.key_name(key)
+        self.pressed_keys.add(name)
+        self._dispatch("press", name)
+
+    def _on_release(self, key):
+        name = self.input.key_name(key)
+        self.pressed_keys.discard(name)
+        self._dispatch("release", name)
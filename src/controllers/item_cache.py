@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+
+class ItemCheckCache:
+    """
+    Bounded LRU cache in front of parse and match: item text -> (ParsedItem, match result).
+
+    Entries are only valid for one target set, so set_targets() clears the cache when the
+    selected mods (or filter expression) change. Items are keyed by their text; the dict
+    uses the string's cached hash and confirms a hit with an equality check, so two items
+    can never share an entry. Cached ParsedItems are shared and must not be modified.
+
+    A max_size of 0 disables the cache: get() and put() return at once. That is the default
+    (item_cache_size in options.json), since rolled values make most item texts unique.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.targets = None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def targets_key(selected_mods):
+        """Hashable key of a list of mods or a filter expression."""
+        return selected_mods if isinstance(selected_mods, str) else tuple(selected_mods)
+
+    def set_targets(self, selected_mods):
+        """Use the cache for a target set; cached results of another set are dropped."""
+        key = self.targets_key(selected_mods)
+        if key != self.targets:
+            self.targets = key
+            self._entries.clear()
+
+    def get(self, item_text):
+        """Returns (parsed_item, match_found) for a known item text, or None."""
+        if not self.max_size:
+            return None
+        entry = self._entries.get(item_text)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(item_text)
+        self.hits += 1
+        return entry
+
+    def put(self, item_text, parsed_item, match_found):
+        if not self.max_size:
+            return
+        self._entries[item_text] = (parsed_item, match_found)
+        self._entries.move_to_end(item_text)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, max_size):
+        self.max_size = max_size
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,97 +1,136 @@
-import json
+import threading
 import time
-import pyperclip
-from pynput.keyboard import Controller as Keyboard
-from pynput.keyboard import Key, Listener
+from controllers.clipboard_backends import create_clipboard_backend
+from controllers.config_service import get_config_service
+from controllers.input_backends import create_input_backend
+from controllers.input_hub import get_input_hub
 
 class KeyboardController:
-    def __init__(self):
-        self.keyboard = Keyboard()
-        self.pressed_keys = set()  # Store pressed keys
-        self.listener = Listener(on_press=self.on_press, on_release=self.on_release)
-        self.listener.start()
-        
+    def __init__(self, clipboard=None, stop_event=None, input_backend=None):
         self.config = self.load_options()
-        
-        self.key_press_delay = self.config.get("execution_delays", {}).get("key_press_delay", 0.1)
-        self.clipboard_copy_delay = self.config.get("execution_delays", {}).get("clipboard_copy_delay", 0.1)
+
+        # Keys and clipboard go through backends so they can be swapped for a simulated game
+        self.input = input_backend or create_input_backend(self.config.get("input_backend", "desktop"))
+        self.stop_event = stop_event or threading.Event()  # Set to interrupt any wait immediately
+        self.hub = get_input_hub(self.input)  # Shared key listener; see InputHub
+        self.apply_options(self.config)
+
+        self._owns_clipboard = clipboard is None  # A clipboard passed in is closed by its owner
+        self.clipboard = clipboard or create_clipboard_backend(self.config.get("clipboard_backend", "pyperclip"))
+
+    def close(self):
+        """Release the clipboard backend created by this controller."""
+        if self._owns_clipboard:
+            self.clipboard.close()
 
     @staticmethod
     def load_options():
-        try:
-            with open("config/options.json", "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print("Error: Options file not found. Using defaults.")
-            return {}
-    
-    def on_press(self, key):
-        try:
-            self.pressed_keys.add(key)
-        except AttributeError:
-            pass
+        return get_config_service().options
 
-    def on_release(self, key):
-        try:
-            if key in self.pressed_keys:
-                self.pressed_keys.remove(key)
-        except AttributeError:
-            pass
+    def apply_options(self, options):
+        """Take the delays from the options; called again when options.json is reloaded."""
+        self.config = options
+        delays = options["execution_delays"]
+        self.key_press_delay = delays["key_press_delay"]
+        self.clipboard_copy_delay = delays["clipboard_copy_delay"]
+        self.clipboard_timeout = delays["clipboard_timeout"]
+        self.clipboard_poll_interval = delays["clipboard_poll_interval"]
+    
+    def sleep(self, seconds):
+        """Wait up to `seconds`; returns True early if the stop event was set."""
+        return self.stop_event.wait(seconds)
 
     def is_pressed(self, key):
-        """Check if a specific key (like Key.f1) is currently pressed."""
-        return key in self.pressed_keys
+        """Check if a key (by name) is currently pressed, as seen by the shared input hub."""
+        return self.hub.is_pressed(key)
 
     def press_button(self, button):
         """Simulate pressing and releasing a key."""
-        self.keyboard.press(button)
-        self.keyboard.release(button)
+        self.input.key_down(button)
+        self.input.key_up(button)
+
+    def hold_key(self, key):
+        """Press a key and keep it held until release_key is called."""
+        self.input.key_down(key)
+
+    def release_key(self, key):
+        """Release a key held with hold_key."""
+        self.input.key_up(key)
 
     def get_ctrl_c(self):
         """Simulate pressing Ctrl + C and return clipboard data."""
-        ctrl = Key.ctrl
+        ctrl = 'ctrl'
         c = 'c'
         
         self.clipboard_clear()
         
-        self.keyboard.press(ctrl)
-        self.keyboard.press(c)
-        time.sleep(self.key_press_delay)  # Use configurable delay
-        self.keyboard.release(c)
-        self.keyboard.release(ctrl)
-        time.sleep(self.key_press_delay)
+        self.input.key_down(ctrl)
+        self.input.key_down(c)
+        self.sleep(self.key_press_delay)  # Use configurable delay
+        self.input.key_up(c)
+        self.input.key_up(ctrl)
+        self.sleep(self.key_press_delay)
 
     def get_ctrl_alt_c(self):
         """Simulate pressing Ctrl + Alt + C."""
-        ctrl = Key.ctrl
-        alt = Key.alt
+        ctrl = 'ctrl'
+        alt = 'alt'
         c = 'c'
 
         self.clipboard_clear()
         
-        self.keyboard.press(ctrl)
-        self.keyboard.press(alt)
-        self.keyboard.press(c)
-        time.sleep(self.key_press_delay)
-        self.keyboard.release(c)
-        self.keyboard.release(alt)
-        self.keyboard.release(ctrl)
-        time.sleep(self.key_press_delay)
-
-    def get_clipboard_data(self):
-        """Retrieve data from the clipboard using pyperclip."""
+        self.input.key_down(ctrl)
+        self.input.key_down(alt)
+        self.input.key_down(c)
+        self.sleep(self.key_press_delay)
+        self.input.key_up(c)
+        self.input.key_up(alt)
+        self.input.key_up(ctrl)
+
+    def wait_for_clipboard(self, timeout=None):
+        """
+        Poll the clipboard with a short backoff until it holds text.
+        Returns the text, or '' if nothing arrived before the timeout.
+        """
+        timeout = self.clipboard_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        interval = self.clipboard_poll_interval
+        while True:
+            text = self.clipboard.paste()
+            if text:
+                return text
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.sleep(min(interval, remaining)):
+                return text
+            interval = min(interval * 2, 0.05)
+
+    def get_clipboard_data(self, previous=None):
+        """
+        Copy the hovered item and return its text as soon as the game has written it.
+
+        If `previous` is given (the text before a currency was applied), the copy is repeated
+        until the item text changes or `clipboard_copy_delay` runs out, in which case the
+        roll is taken as identical to the previous one.
+        """
         print("Getting clipboard data...")
         try:
-            self.get_ctrl_alt_c()
-            time.sleep(self.clipboard_copy_delay)  # Ensure the clipboard operation has completed
-            return pyperclip.paste()
+            deadline = time.monotonic() + self.clipboard_copy_delay
+            interval = self.clipboard_poll_interval
+            while True:
+                self.get_ctrl_alt_c()
+                text = self.wait_for_clipboard()
+                if previous is None or text != previous or time.monotonic() >= deadline:
+                    return text
+                if self.sleep(interval):
+                    return text
+                interval = min(interval * 2, 0.05)
         except Exception as e:
             print(f"Error retrieving clipboard data: {e}")
             return None
 
     def clipboard_clear(self):
-        """Clear the clipboard using pyperclip."""
+        """Clear the clipboard through the clipboard backend."""
         try:
-            pyperclip.copy('')  # Clears the clipboard by copying an empty string
+            self.clipboard.clear()
         except Exception as e:
             print(f"Error clearing clipboard: {e}")
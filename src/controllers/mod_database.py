@@ -0,0 +1,260 @@
+import re
+from controllers.file_manager import FileManager
+from controllers.mod_parser import mod_roll_key, mod_template
+from controllers.mod_search import ModSearchIndex
+
+_FIRST_RANGE_RE = re.compile(r"\((-?[\d.]+)-(-?[\d.]+)\)")
+
+
+class ModTable:
+    """
+    Column-oriented view of one mod file with indexes by tag, by mod template and by roll
+    key (the mod text with its ranges, which identifies a tier; see mod_roll_key).
+    """
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+
+        # Typed columns used by the views, sorting and probability code
+        self.mods = columns.get("Mod", [])
+        self.tags = columns.get("Tag", [""] * len(self.mods))
+        self.tiers = columns.get("Tier")
+        self.item_levels = columns.get("iLvl")
+        self.weights = columns.get("Weight")
+        self.weight_percents = columns.get("Weight%")
+
+        if "Prefix%" in columns:
+            self.affix_type = "prefix"
+        elif "Suffix%" in columns:
+            self.affix_type = "suffix"
+        else:
+            lowered = name.lower()
+            self.affix_type = "prefix" if "prefix" in lowered else "suffix" if "suffix" in lowered else None
+        self.affix_percents = columns.get("Prefix%", columns.get("Suffix%"))
+
+        self.templates = [mod_template(mod) for mod in self.mods]
+        self.by_tag = {}
+        self.by_template = {}
+        self.by_roll_key = {}
+        for row, (tag, template) in enumerate(zip(self.tags, self.templates)):
+            if tag:
+                self.by_tag.setdefault(tag, []).append(row)
+            self.by_template.setdefault(template, []).append(row)
+            self.by_roll_key.setdefault(mod_roll_key(self.mods[row]), []).append(row)
+
+        self._metadata = {}
+        self._value_ranges = None
+        self._records = None
+        self._search_index = None
+        self._sort_orders = {}
+
+    def __len__(self):
+        return len(self.mods)
+
+    def record(self, row):
+        """
+        Returns one row as a dict keyed by the file's column names.
+        """
+        return {field: values[row] for field, values in self.columns.items()}
+
+    def records(self):
+        """
+        Returns all rows as dicts. Built once and shared, so callers must not modify them.
+        """
+        if self._records is None:
+            self._records = [self.record(row) for row in range(len(self))]
+        return self._records
+
+    def metadata(self, row):
+        """
+        Returns the fields a parsed mod is enriched with, built once per row and shared.
+        """
+        metadata = self._metadata.get(row)
+        if metadata is None:
+            metadata = {"table": self.name, "row": row}
+            for field, values in (("table_tier", self.tiers), ("required_level", self.item_levels),
+                                  ("weight", self.weights), ("weight_percent", self.weight_percents)):
+                if values is not None:
+                    metadata[field] = values[row]
+            self._metadata[row] = metadata
+        return metadata
+
+    def value_range(self, row):
+        """The first (min, max) range of a row's mod text, or None."""
+        if self._value_ranges is None:
+            self._value_ranges = []
+            for mod in self.mods:
+                match = _FIRST_RANGE_RE.search(mod)
+                self._value_ranges.append((float(match.group(1)), float(match.group(2))) if match else None)
+        return self._value_ranges[row]
+
+    def sort_order(self, column, descending=False):
+        """
+        Returns the rows ordered by a column. Keys are typed (numbers compare as numbers,
+        text case-insensitively) and the ascending permutation is computed once per column.
+        """
+        order = self._sort_orders.get(column)
+        if order is None:
+            values = self.columns[column]
+            if values and isinstance(values[0], str):
+                keys = [value.casefold() for value in values]
+            else:
+                keys = values
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._sort_orders[column] = order
+        return order[::-1] if descending else order
+
+    def get_search_index(self):
+        """
+        Returns the text search index of the table, built on first use.
+        """
+        if self._search_index is None:
+            self._search_index = ModSearchIndex(self.mods, self.tags)
+        return self._search_index
+
+
+class ModDatabase:
+    """
+    Loads every mod file once and keeps it in memory, with indexes shared across files.
+    Index entries are (table name, row) pairs.
+
+    lookup() links a rolled mod to its row: the roll key index resolves advanced item text
+    (which shows the tier's ranges) with one dict lookup, and the template index covers
+    item text without ranges. The same mod is listed with other weights and tiers for other
+    base types, so lookups are limited to the tables of the base type being crafted (see
+    base_tables).
+    """
+    LOOKUP_MEMO_SIZE = 4096
+
+    def __init__(self, file_manager=None):
+        self.file_manager = file_manager or FileManager()
+        self.tables = {}
+        self.by_tag = {}
+        self.by_affix_type = {}
+        self.by_template = {}
+        self.by_roll_key = {}
+        self._template_lookups = {}
+        # Rolled mod texts repeat a lot between rolls; remember what each one resolved to
+        self._lookups = {}
+
+    def load(self):
+        """
+        Loads all mod files from the file manager's directory.
+        """
+        for filename in self.file_manager.list_files():
+            if filename not in self.tables:
+                self._add_table(filename)
+        return self
+
+    def list_tables(self):
+        return list(self.tables)
+
+    def get_table(self, filename):
+        """
+        Returns the table for a mod file, loading it on first use.
+        """
+        table = self.tables.get(filename)
+        if table is None:
+            table = self._add_table(filename)
+        return table
+
+    def affix_tables(self, filename):
+        """
+        Returns the prefix and suffix tables of the base type of a mod file, paired by name
+        ("prefix_jewel.csv" <-> "suffix_jewel.csv"). A missing side is None.
+        """
+        tables = {"prefix": None, "suffix": None}
+        table = self.get_table(filename)
+        if table.affix_type in tables:
+            tables[table.affix_type] = table
+            other_type = "suffix" if table.affix_type == "prefix" else "prefix"
+            other_name = filename.replace(table.affix_type, other_type)
+            if other_name != filename and other_name in self.file_manager.list_files():
+                tables[other_type] = self.get_table(other_name)
+        return tables
+
+    def base_tables(self, filename):
+        """Names of the prefix and suffix tables of the base type of a mod file."""
+        return tuple(table.name for table in self.affix_tables(filename).values() if table is not None)
+
+    def rows_for_tag(self, tag):
+        return self.by_tag.get(tag, [])
+
+    def rows_for_affix_type(self, affix_type):
+        return self.by_affix_type.get(affix_type, [])
+
+    def rows_for_template(self, template):
+        return self.by_template.get(template, [])
+
+    def _accepts(self, entry, affix_type, tables):
+        if tables is not None and entry[0] not in tables:
+            return False
+        return affix_type is None or self.tables[entry[0]].affix_type in (affix_type, None)
+
+    def lookup(self, mod_text, affix_type=None, value=None, tier=None, tables=None):
+        """
+        Returns the (table name, row) of a rolled mod or None. `mod_text` is the item line
+        (hybrid lines joined with ", "); affix_type, the rolled value and the item's tier
+        pick between candidate rows when the text alone is ambiguous. `tables` limits the
+        search to these table names (see base_tables).
+        """
+        entries = self.by_roll_key.get(mod_roll_key(mod_text))
+        if entries:
+            for entry in entries:
+                if self._accepts(entry, affix_type, tables):
+                    return entry
+
+        # No ranges in the text: pick the template's tier by value, then by tier
+        key = (mod_template(mod_text), affix_type, value, tier, tables)
+        if key in self._template_lookups:
+            return self._template_lookups[key]
+        candidates = [entry for entry in self.by_template.get(key[0], [])
+                      if self._accepts(entry, affix_type, tables)]
+        found = candidates[0] if candidates else None
+        for filename, row in candidates:
+            table = self.tables[filename]
+            value_range = table.value_range(row)
+            if value is not None and value_range and min(value_range) <= value <= max(value_range):
+                found = (filename, row)
+                break
+            if tier is not None and table.tiers is not None and table.tiers[row] == tier:
+                found = (filename, row)
+        self._template_lookups[key] = found
+        return found
+
+    def enrich_mod(self, mod_data, mod_text, tables=None):
+        """
+        Adds the mod file metadata of a parsed mod (table, row, table_tier, required_level,
+        weight, weight_percent) and fills its tier from the table when the item text had none.
+        `tables` are the table names of the crafted base type (see base_tables).
+        """
+        key = (mod_text, mod_data.get("type"), mod_data.get("tier"), tables)
+        found = self._lookups.get(key, False)
+        if found is False:
+            found = self.lookup(mod_text, key[1], mod_data.get("value"), key[2], tables)
+            if len(self._lookups) >= self.LOOKUP_MEMO_SIZE:
+                self._lookups.clear()
+            self._lookups[key] = found
+        if found is None:
+            return mod_data
+        metadata = self.tables[found[0]].metadata(found[1])
+        mod_data.update(metadata)
+        if mod_data.get("tier") is None:
+            mod_data["tier"] = metadata.get("table_tier")
+        return mod_data
+
+    def _add_table(self, filename):
+        table = ModTable(filename, self.file_manager.load_mod_columns(filename))
+        self.tables[filename] = table
+
+        for tag, rows in table.by_tag.items():
+            self.by_tag.setdefault(tag, []).extend((filename, row) for row in rows)
+        for template, rows in table.by_template.items():
+            self.by_template.setdefault(template, []).extend((filename, row) for row in rows)
+        for roll_key, rows in table.by_roll_key.items():
+            self.by_roll_key.setdefault(roll_key, []).extend((filename, row) for row in rows)
+        self._template_lookups.clear()
+        self._lookups.clear()
+        if table.affix_type:
+            self.by_affix_type.setdefault(table.affix_type, []).extend((filename, row) for row in range(len(table)))
+        return table
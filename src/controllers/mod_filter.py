@@ -0,0 +1,305 @@
+import operator
+import re
+from controllers.mod_parser import ModMatcher, ParsedItem, mod_template
+
+# Filter language (keywords are case-insensitive):
+#
+#   expression := term (OR term)*
+#   term       := factor (AND factor)*
+#   factor     := NOT factor | "(" expression ")" | count | mod
+#   count      := COUNT "(" expression ("," expression)* ")" op number
+#   mod        := string ["[" condition ("," condition)* "]"]
+#   condition  := TIER op number | VALUE op number | WEIGHT op number | PREFIX | SUFFIX
+#   op         := "<" | "<=" | ">" | ">=" | "=" | "!="
+#
+# A mod is a quoted mod text or template ("increased Fire Damage", "Adds # to # Cold Damage")
+# found in an item mod like a selected mod in the Magic Craft tab. Its conditions must hold
+# for the same item mod (WEIGHT needs a parser linked to the base type's mod files), e.g.
+#
+#   "increased Fire Damage" [tier <= 2] AND NOT "Chaos Damage"
+#   COUNT("Fire Damage", "Cold Damage", "Lightning Damage") >= 2 OR "% to all Elemental Resistances" [value >= 10]
+
+_TOKEN_RE = re.compile(r"""
+    (?:
+        (?P<string>"[^"]*"|'[^']*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op><=|>=|!=|==|<|>|=)
+      | (?P<punct>[()\[\],])
+      | (?P<word>[A-Za-z_]+)
+    )""", re.VERBOSE)
+
+KEYWORDS = ("AND", "OR", "NOT", "COUNT", "TIER", "VALUE", "WEIGHT", "PREFIX", "SUFFIX")
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class FilterSyntaxError(ValueError):
+    """Raised for an invalid filter expression; `position` is the offset of the error."""
+    def __init__(self, message, position):
+        super().__init__(f"{message} (at position {position})")
+        self.position = position
+
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        while expression[position].isspace():
+            position += 1
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise FilterSyntaxError(f"Unexpected character {expression[position]!r}", position)
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == "string":
+            value = value[1:-1]
+        elif kind == "number":
+            value = float(value)
+        elif kind == "word":
+            value = value.upper()
+            if value not in KEYWORDS:
+                raise FilterSyntaxError(f"Unknown keyword {match.group(kind)!r}; quote mod texts", start)
+            kind = "keyword"
+        tokens.append((kind, value, start))
+        position = match.end()
+    tokens.append(("end", None, len(expression)))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser producing a tree of tuples:
+    ("mod", leaf), ("and", children), ("or", children), ("not", child), ("count", children, op, n).
+    Mod leaves are collected in `leaves` as (text, conditions).
+    """
+    def __init__(self, expression):
+        self.tokens = tokenize(expression)
+        self.index = 0
+        self.leaves = []
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def accept(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            return self.advance()
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            found = self.peek()
+            expected = repr(value) if value is not None else kind
+            raise FilterSyntaxError(f"Expected {expected}, found {found[1] if found[1] is not None else 'end'!r}", found[2])
+        return token
+
+    def parse(self):
+        node = self.expression()
+        self.expect("end")
+        return node
+
+    def expression(self):
+        children = [self.term()]
+        while self.accept("keyword", "OR"):
+            children.append(self.term())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def term(self):
+        children = [self.factor()]
+        while self.accept("keyword", "AND"):
+            children.append(self.factor())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def factor(self):
+        if self.accept("keyword", "NOT"):
+            return ("not", self.factor())
+        if self.accept("punct", "("):
+            node = self.expression()
+            self.expect("punct", ")")
+            return node
+        if self.accept("keyword", "COUNT"):
+            return self.count()
+        token = self.peek()
+        if token[0] == "string":
+            return self.mod()
+        raise FilterSyntaxError(f"Expected a quoted mod, NOT, COUNT or '(', found {token[1] if token[1] is not None else 'end'!r}", token[2])
+
+    def count(self):
+        self.expect("punct", "(")
+        children = [self.expression()]
+        while self.accept("punct", ","):
+            children.append(self.expression())
+        self.expect("punct", ")")
+        op = self.expect("op")[1]
+        number = self.expect("number")[1]
+        return ("count", children, op, number)
+
+    def mod(self):
+        text = self.advance()[1]
+        if not text.strip():
+            raise FilterSyntaxError("Empty mod text", self.tokens[self.index - 1][2])
+        conditions = []
+        if self.accept("punct", "["):
+            conditions.append(self.condition())
+            while self.accept("punct", ","):
+                conditions.append(self.condition())
+            self.expect("punct", "]")
+        self.leaves.append((text, tuple(conditions)))
+        return ("mod", len(self.leaves) - 1)
+
+    def condition(self):
+        token = self.expect("keyword")
+        if token[1] in ("PREFIX", "SUFFIX"):
+            return ("type", "==", token[1].lower())
+        if token[1] in ("TIER", "VALUE", "WEIGHT"):
+            op = self.expect("op")[1]
+            number = self.expect("number")[1]
+            return (token[1].lower(), op, number)
+        raise FilterSyntaxError(f"Expected TIER, VALUE, WEIGHT, PREFIX or SUFFIX, found {token[1]!r}", token[2])
+
+
+def _compile_conditions(conditions):
+    """One predicate over an item mod dict for all conditions of a leaf, or None."""
+    checks = tuple((field, OPERATORS[op], number) for field, op, number in conditions)
+    if not checks:
+        return None
+
+    def check(mod):
+        for field, compare, number in checks:
+            value = mod.get(field)
+            if value is None or not compare(value, number):
+                return False
+        return True
+    return check
+
+
+def _compile_node(node):
+    """
+    Compiles the tree into closures over `hits`, the bit mask of satisfied leaves.
+    Groups whose children are all plain leaves reduce to a single mask test.
+    """
+    kind = node[0]
+    if kind == "mod":
+        bit = 1 << node[1]
+        return lambda hits: hits & bit != 0
+
+    if kind == "not":
+        child = _compile_node(node[1])
+        return lambda hits: not child(hits)
+
+    children = node[1]
+    leaf_mask = 0
+    for child in children:
+        if child[0] == "mod":
+            leaf_mask |= 1 << child[1]
+    others = tuple(_compile_node(child) for child in children if child[0] != "mod")
+
+    if kind == "and":
+        if not others:
+            return lambda hits: hits & leaf_mask == leaf_mask
+        return lambda hits: hits & leaf_mask == leaf_mask and all(child(hits) for child in others)
+
+    if kind == "or":
+        if not others:
+            return lambda hits: hits & leaf_mask != 0
+        return lambda hits: hits & leaf_mask != 0 or any(child(hits) for child in others)
+
+    # count
+    compare, number = OPERATORS[node[2]], node[3]
+    if not others:
+        return lambda hits: compare(bin(hits & leaf_mask).count("1"), number)
+    return lambda hits: compare(bin(hits & leaf_mask).count("1") + sum(1 for child in others if child(hits)), number)
+
+
+class ModFilter:
+    """
+    A compiled mod filter.
+
+    Every quoted mod of the expression is a leaf. Leaf templates go into one ModMatcher,
+    so a roll is evaluated with a single pass over the item mods that sets a bit per
+    satisfied leaf (template found and its tier/value/type conditions hold for that mod),
+    followed by the compiled boolean program over the bit mask.
+    """
+    def __init__(self, expression, tree, leaves):
+        self.expression = expression
+        self.leaves = leaves
+        self.matcher = ModMatcher([text for text, _ in leaves])
+        self.conditions = tuple(_compile_conditions(conditions) for _, conditions in leaves)
+        self.has_conditions = any(self.conditions)
+        self.program = _compile_node(tree) if tree is not None else (lambda hits: True)
+
+    @classmethod
+    def from_mods(cls, selected_mods, filter_type="and", count=None):
+        """
+        Filter over a plain list of mods: all of them ("and"), any of them ("or"), or at
+        least `count` of them ("count").
+        """
+        selected_mods = list(selected_mods)
+        leaves = [(mod, ()) for mod in selected_mods]
+        mods = [("mod", index) for index in range(len(leaves))]
+        quoted = [f'"{mod}"' for mod in selected_mods]
+        # The expression text is the equivalent filter expression, so it reads (and compiles) like the tree
+        if not mods:
+            tree, expression = None, ""
+        elif filter_type == "and":
+            tree, expression = ("and", mods), " AND ".join(quoted)
+        elif filter_type == "or":
+            tree, expression = ("or", mods), " OR ".join(quoted)
+        elif filter_type == "count":
+            count = len(mods) if count is None else count
+            tree, expression = ("count", mods, ">=", count), f"COUNT({', '.join(quoted)}) >= {count}"
+        else:
+            raise ValueError(f"Unknown filter type '{filter_type}'.")
+        return cls(expression, tree, leaves)
+
+    def leaf_hits(self, item_mods):
+        """Bit mask of the leaves satisfied by the item mods (list or ParsedItem)."""
+        if isinstance(item_mods, ParsedItem):
+            item_mods = item_mods.mods
+        search = self.matcher._search
+        conditions = self.conditions
+        hits = 0
+        for mod in item_mods:
+            template = mod.get("template")
+            if template is None:
+                template = mod_template(mod["mod_value"])
+            for leaf in search(template):
+                check = conditions[leaf] if self.has_conditions else None
+                if check is None or check(mod):
+                    hits |= 1 << leaf
+        return hits
+
+    def matches(self, item_mods):
+        """Returns True if the item mods (list or ParsedItem) satisfy the filter."""
+        return self.program(self.leaf_hits(item_mods))
+
+    def __repr__(self):
+        return f"ModFilter({self.expression!r})"
+
+
+def compile_filter(expression):
+    """
+    Compiles a filter expression (see the grammar above) into a ModFilter.
+    Raises FilterSyntaxError if the expression is invalid.
+    """
+    if not expression.strip():
+        return ModFilter(expression, None, [])
+    parser = _Parser(expression)
+    tree = parser.parse()
+    return ModFilter(expression, tree, parser.leaves)
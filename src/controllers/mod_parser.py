@@ -1,32 +1,125 @@
 import re
 
+# Patterns are compiled once at import time; parsing an item runs each of them at most once.
+_HEADER_RE = re.compile(r"Rarity: (.+)(?:\n(.+))?")
+_STACK_SIZE_RE = re.compile(r"Stack Size: (\d+)/(\d+)")
+_ITEM_LEVEL_RE = re.compile(r"Item Level: (\d+)")
+# A mod header and all of its lines; hybrid mods span one line per part
+_MOD_RE = re.compile(r"{ (.+?) }\n((?:(?!--------|{ ).+\n?)+)")
+_TIER_RE = re.compile(r"Tier: (\d+)")
+_TAGS_RE = re.compile(r"— (.+)")
+_RANGE_RE = re.compile(r"(\d+)-(\d+)")
+_PERCENT_VALUE_RE = re.compile(r"\(?\d+-?\d*\)?%")
+_PLUS_VALUE_RE = re.compile(r"\+\(?\d+-?\d*\)?")
+_VALUE_RE = re.compile(r"\(?\d+-?\d*\)?")
+# A rolled value with its optional range ("16(14-16)", "+6(6-8)") or a bare range ("(14-16)")
+_TEMPLATE_VALUE_RE = re.compile(r"[+-]?(?:\d+(?:\.\d+)?(?:\(-?[\d.]+--?[\d.]+\))?|\(-?[\d.]+--?[\d.]+\))")
+# The rolled number in front of a "(min-max)" range
+_ROLL_BEFORE_RANGE_RE = re.compile(r"\d+(?:\.\d+)?(?=\()")
+# A rolled number, i.e. one that is not part of a "(min-max)" range
+_ROLLED_VALUE_RE = re.compile(r"(?<![\d(.-])-?\d+(?:\.\d+)?")
+
+
+def mod_template(mod_text):
+    """
+    Returns the value-free template of a mod, identical for an item roll and its mod table row.
+    """
+    return _TEMPLATE_VALUE_RE.sub('#', mod_text)
+
+
+def mod_roll_key(mod_text):
+    """
+    Returns the mod text with rolled values dropped and ranges kept ("16(14-16)% increased
+    Fire Damage" -> "(14-16)% increased Fire Damage"), which is how the mod files list a
+    mod tier. Unlike the template it tells tiers of the same mod apart.
+    """
+    return _ROLL_BEFORE_RANGE_RE.sub('', mod_text)
+
+
+class ParsedItem:
+    """
+    Result of a single parse of the item clipboard text.
+    """
+    __slots__ = ("text", "rarity", "name", "item_level", "current_stack", "max_stack",
+                 "mods", "prefix_count", "suffix_count")
+
+    def __init__(self, text, rarity, name, item_level, current_stack, max_stack, mods):
+        self.text = text
+        self.rarity = rarity
+        self.name = name
+        self.item_level = item_level
+        self.current_stack = current_stack
+        self.max_stack = max_stack
+        self.mods = mods
+        self.prefix_count = sum(1 for mod in mods if mod["type"] == "prefix")
+        self.suffix_count = len(mods) - self.prefix_count
+
+    def __repr__(self):
+        return (f"ParsedItem(rarity={self.rarity!r}, name={self.name!r}, item_level={self.item_level!r}, "
+                f"prefixes={self.prefix_count}, suffixes={self.suffix_count})")
+
+
 class ModParser:
-    def parse_item_details(self, item_text):
+    COMPILED_MEMO_SIZE = 64
+
+    def __init__(self, mod_database=None, mod_file=None):
+        # With a ModDatabase and the mod file of the crafted base type, parsed mods are
+        # linked to their mod file row (see ModDatabase.lookup)
+        self.mod_database = mod_database
+        self.mod_tables = None
+        self.set_mod_file(mod_file)
+        # compare_mods called with plain lists compiles each target set once
+        self._compiled = {}
+
+    def set_mod_file(self, mod_file):
         """
-        Extracts item rarity, name, and stack size from the item text.
+        Links parsed mods to the prefix and suffix tables of this mod file's base type.
+        Without a mod file, mods carry only what the item text shows.
         """
-        rarity_match = re.search(r"Rarity: (.+)", item_text)
-        name_match = re.search(r"Rarity: .+\n(.+)", item_text)
-        stack_size_match = re.search(r"Stack Size: (\d+)/(\d+)", item_text)
+        if self.mod_database is None or mod_file is None:
+            self.mod_tables = None
+        else:
+            self.mod_tables = self.mod_database.base_tables(mod_file)
+
+    def parse_item(self, item_text):
+        """
+        Parses the item text once and returns a ParsedItem. Passing a ParsedItem returns it unchanged.
+        """
+        if isinstance(item_text, ParsedItem):
+            return item_text
 
-        rarity = rarity_match.group(1) if rarity_match else None
-        name = name_match.group(1) if name_match else None
-        current_stack = int(stack_size_match.group(1)) if stack_size_match else None
-        max_stack = int(stack_size_match.group(2)) if stack_size_match else None
+        header_match = _HEADER_RE.search(item_text)
+        stack_size_match = _STACK_SIZE_RE.search(item_text)
+        item_level_match = _ITEM_LEVEL_RE.search(item_text)
 
+        return ParsedItem(
+            text=item_text,
+            rarity=header_match.group(1).strip() if header_match else None,
+            name=header_match.group(2) if header_match else None,
+            item_level=int(item_level_match.group(1)) if item_level_match else None,
+            current_stack=int(stack_size_match.group(1)) if stack_size_match else None,
+            max_stack=int(stack_size_match.group(2)) if stack_size_match else None,
+            mods=self._parse_mod_matches(item_text),
+        )
+
+    def parse_item_details(self, item_text):
+        """
+        Extracts item rarity, name, and stack size from the item text.
+        """
+        item = self.parse_item(item_text)
         return {
-            "rarity": rarity,
-            "name": name,
-            "current_stack": current_stack,
-            "max_stack": max_stack
+            "rarity": item.rarity,
+            "name": item.name,
+            "current_stack": item.current_stack,
+            "max_stack": item.max_stack
         }
 
     def normalize_mod(self, mod):
         """
         Normalizes mod descriptions by replacing value ranges and standardizing format.
         """
-        mod = re.sub(r'\(?\d+-?\d*\)?%', '#%', mod)
-        mod = re.sub(r'\+\(?\d+-?\d*\)?', '#', mod)
+        mod = _PERCENT_VALUE_RE.sub('#%', mod)
+        mod = _PLUS_VALUE_RE.sub('#', mod)
         return mod
 
     def extract_general_mod(self, mod_text):
@@ -34,38 +127,34 @@ class ModParser:
         Extracts a general version of the mod text by removing specific values.
         """
         # Remove any number ranges and specific values to create a general mod description
-        general_mod = re.sub(r'\(?\d+-?\d*\)?%', '#%', mod_text)
-        general_mod = re.sub(r'\(?\d+-?\d*\)?', '#', general_mod)
+        general_mod = _PERCENT_VALUE_RE.sub('#%', mod_text)
+        general_mod = _VALUE_RE.sub('#', general_mod)
         return general_mod
-    
+
     def get_item_rarity(self, item_text):
         """
         Returns the item rarity based on the parsed text.
         """
-        rarity = re.search(r"Rarity: (.+)", item_text).group(1).strip()
-        return rarity
+        return self.parse_item(item_text).rarity
 
     def get_open_affixes(self, item_text):
         """
-        Returns bool if item has open affix and absent affixes based on the item text.
+        Returns bool if item has open affix and absent affixes based on the item text or a ParsedItem.
         """
-        item_rarity = self.get_item_rarity(item_text)
-        item_mods = self.parse_mods(item_text)
+        item = self.parse_item(item_text)
+        prefix_count = item.prefix_count
+        suffix_count = item.suffix_count
 
-        # Count the prefixes and suffixes
-        prefix_count = len([mod for mod in item_mods if mod["type"] == "prefix"])
-        suffix_count = len([mod for mod in item_mods if mod["type"] == "suffix"])
-        
         absent_affixes = []
 
         # Check based on rarity
-        if item_rarity == "Magic":
+        if item.rarity == "Magic":
             has_open_affix = prefix_count < 1 or suffix_count < 1
             if prefix_count < 1:
                 absent_affixes.append("prefix")
             if suffix_count < 1:
                 absent_affixes.append("suffix")
-        elif item_rarity == "Rare":
+        elif item.rarity == "Rare":
             has_open_affix = prefix_count < 3 or suffix_count < 3
             if prefix_count < 3:
                 absent_affixes.append("prefix")
@@ -73,11 +162,11 @@ class ModParser:
                 absent_affixes.append("suffix")
         else:
             has_open_affix = False
-            
+
         print(f"Prefixes: {prefix_count}, Suffixes: {suffix_count}")
-            
+
         return has_open_affix, absent_affixes
-    
+
     def get_mod_tier(self, item_mods, mod_name):
         """
         Returns the tier of a specific mod from the item mods.
@@ -86,49 +175,188 @@ class ModParser:
             if mod["mod"] == mod_name:
                 return mod["tier"]
         return None
-    
+
     def parse_mods(self, item_text):
         """
-        Extracts and normalizes mods from the item text, including detailed information.
+        Extracts and normalizes mods from the item text (or a ParsedItem), including detailed information.
         """
+        if isinstance(item_text, ParsedItem):
+            return item_text.mods
+        return self._parse_mod_matches(item_text)
+
+    def _parse_mod_matches(self, item_text):
         detailed_mods = []
-        mod_matches = re.findall(r"{ (.+?) }\n(.+)", item_text)
 
-        for mod in mod_matches:
-            mod_data = {}
+        for header, mod_lines in _MOD_RE.findall(item_text):
+            # Hybrid mods are joined the way the mod files list them: "A, B"
+            mod_text = mod_lines.strip()
+            if "\n" in mod_text:
+                mod_text = ", ".join(line.strip() for line in mod_text.splitlines() if line.strip())
 
-            # Determine if it's a prefix or suffix
-            modifier_type = "prefix" if "Prefix" in mod[0] else "suffix"
-            
             # Extract tier, tags, and value ranges if available
-            tier_match = re.search(r"Tier: (\d+)", mod[0])
-            tag_match = re.search(r"— (.+)", mod[0])
-            range_match = re.search(r"(\d+)-(\d+)", mod[1])
-
-            # Normalize the mod text and generalize it
-            normalized_mod = self.normalize_mod(mod[1])
-            general_mod = self.extract_general_mod(mod[1])
-
-            mod_data["type"] = modifier_type
-            mod_data["tier"] = int(tier_match.group(1)) if tier_match else None
-            mod_data["tags"] = tag_match.group(1).split(", ") if tag_match else []
-            mod_data["mod_value"] = normalized_mod
-            mod_data["mod"] = general_mod  # This is the general form of the mod
+            tier_match = _TIER_RE.search(header)
+            tag_match = _TAGS_RE.search(header)
+            range_match = _RANGE_RE.search(mod_text)
+            value_match = _ROLLED_VALUE_RE.search(mod_text)
+
+            # The percent pass is shared by the normalized and the general form of the mod
+            percent_mod = _PERCENT_VALUE_RE.sub('#%', mod_text)
+
+            mod_data = {
+                "type": "prefix" if "Prefix" in header else "suffix",
+                "tier": int(tier_match.group(1)) if tier_match else None,
+                "tags": tag_match.group(1).split(", ") if tag_match else [],
+                "mod_value": _PLUS_VALUE_RE.sub('#', percent_mod),
+                "mod": _VALUE_RE.sub('#', percent_mod),  # This is the general form of the mod
+                "template": mod_template(mod_text),
+                "value": float(value_match.group()) if value_match else None,  # First rolled value
+            }
             if range_match:
                 mod_data["range"] = (int(range_match.group(1)), int(range_match.group(2)))
+            if self.mod_tables is not None:
+                self.mod_database.enrich_mod(mod_data, mod_text, self.mod_tables)
 
             detailed_mods.append(mod_data)
 
         return detailed_mods
 
-    def compare_mods(self, item_mods, selected_mods):
+    def compile_targets(self, selected_mods):
+        """
+        Builds a ModMatcher for the selected mods, to be reused for every roll.
+        """
+        return ModMatcher(selected_mods)
+
+    def compile_filter(self, selected_mods, filter_type="and", count=None):
+        """
+        Builds a ModFilter from a filter expression (see mod_filter) or from a list of mods
+        combined by filter_type ("and", "or" or "count" with at least `count` matches).
+        """
+        from controllers.mod_filter import ModFilter, compile_filter
+        if isinstance(selected_mods, str):
+            return compile_filter(selected_mods)
+        return ModFilter.from_mods(selected_mods, filter_type, count)
+
+    def compare_mods(self, item_mods, selected_mods, filter_type="and", count=None):
+        """
+        Compares item mods with selected mods: a list of mods, a filter expression, or a
+        compiled ModMatcher/ModFilter.
+
+        filter_type "and": every selected mod must be found in one of the item mods.
+        filter_type "or": at least one selected mod must be found.
+        filter_type "count": at least `count` selected mods must be found.
+        """
+        if isinstance(selected_mods, ModMatcher) and filter_type != "and":
+            selected_mods = selected_mods.selected_mods
+        if hasattr(selected_mods, "matches"):
+            return selected_mods.matches(item_mods)  # Compiled ModMatcher or ModFilter
+        return self._compiled_targets(selected_mods, filter_type, count).matches(item_mods)
+
+    def _compiled_targets(self, selected_mods, filter_type, count):
+        targets = selected_mods if isinstance(selected_mods, str) else tuple(selected_mods)
+        key = (targets, filter_type, count)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            if filter_type == "and" and not isinstance(targets, str):
+                compiled = self.compile_targets(targets)
+            else:
+                compiled = self.compile_filter(targets, filter_type, count)
+            if len(self._compiled) >= self.COMPILED_MEMO_SIZE:
+                self._compiled.clear()
+            self._compiled[key] = compiled
+        return compiled
+
+
+class ModMatcher:
+    """
+    Matches item mods against a fixed list of target mods.
+
+    Targets are keyed by template and compiled into an Aho-Corasick automaton, so a roll is
+    checked with one pass over each item mod. A target matches when its template is contained
+    in an item mod template, which covers partial templates and single lines of hybrid mods.
+    """
+    MEMO_SIZE = 4096
+
+    def __init__(self, selected_mods):
+        self.selected_mods = list(selected_mods)
+        self.templates = {}  # template -> target indexes
+        for index, mod in enumerate(self.selected_mods):
+            self.templates.setdefault(mod_template(mod), []).append(index)
+        self.target_count = len(self.selected_mods)
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for template, indexes in self.templates.items():
+            self._add_pattern(template, indexes)
+        self._build_failure_links()
+
+        # Item mod templates repeat a lot between rolls; remember what each one matched
+        self._memo = {}
+
+    def _add_pattern(self, pattern, indexes):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + tuple(indexes)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] = self._output[next_state] + self._output[fail]
+
+    def _search(self, template):
+        found = self._memo.get(template)
+        if found is not None:
+            return found
+
+        goto, fail, output = self._goto, self._fail, self._output
+        hits = set()
+        state = 0
+        for char in template:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+
+        found = frozenset(hits)
+        if len(self._memo) >= self.MEMO_SIZE:
+            self._memo.clear()
+        self._memo[template] = found
+        return found
+
+    def matched_targets(self, item_mods):
         """
-        Compares item mods with selected mods. Assumes selected_mods are in a cleaned, standardized format.
+        Returns the indexes of the selected mods found in the item mods (list or ParsedItem).
         """
-        item_mods = [self.normalize_mod(mod["mod_value"]) for mod in item_mods]  # Use normalized mod_value for comparison
-        cleaned_selected_mods = [self.normalize_mod(mod) for mod in selected_mods]
+        if isinstance(item_mods, ParsedItem):
+            item_mods = item_mods.mods
+        matched = set()
+        for mod in item_mods:
+            template = mod.get("template")
+            if template is None:
+                template = mod_template(mod["mod_value"])
+            matched |= self._search(template)
+        return matched
 
-        for selected_mod in cleaned_selected_mods:
-            if not any(selected_mod in mod for mod in item_mods):
-                return False
-        return True
+    def matches(self, item_mods):
+        """
+        Returns True if every selected mod is present in the item mods.
+        """
+        if not self.target_count:
+            return True
+        return len(self.matched_targets(item_mods)) == self.target_count
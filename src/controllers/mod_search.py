@@ -0,0 +1,57 @@
+class ModSearchIndex:
+    """
+    Trigram index over the lowercased mod text and tag of every row of a mod table.
+
+    A query matches a row when it is a substring of the row's mod or tag. Queries that
+    extend the previous one only re-check the previous results.
+    """
+    GRAM_SIZE = 3
+
+    def __init__(self, mods, tags):
+        self.mods = [mod.lower() for mod in mods]
+        self.tags = [tag.lower() for tag in tags]
+        self.row_count = len(self.mods)
+
+        self.postings = {}
+        for row, (mod, tag) in enumerate(zip(self.mods, self.tags)):
+            for gram in self._grams(mod) | self._grams(tag):
+                self.postings.setdefault(gram, []).append(row)
+
+        self._last_query = ""
+        self._last_result = list(range(self.row_count))
+
+    def _grams(self, text):
+        size = self.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _candidates(self, query):
+        if self._last_query and self._last_query in query:
+            # Anything matching the longer query also matched the previous one
+            return self._last_result
+        if len(query) < self.GRAM_SIZE:
+            return range(self.row_count)
+
+        postings = sorted((self.postings.get(gram, ()) for gram in self._grams(query)), key=len)
+        if not postings[0]:
+            return []
+        rows = set(postings[0])
+        for posting in postings[1:]:
+            rows.intersection_update(posting)
+            if not rows:
+                break
+        return sorted(rows)
+
+    def search(self, query):
+        """
+        Returns the matching row indexes in table order.
+        """
+        query = query.lower()
+        if not query:
+            result = list(range(self.row_count))
+        else:
+            mods, tags = self.mods, self.tags
+            result = [row for row in self._candidates(query) if query in mods[row] or query in tags[row]]
+
+        self._last_query = query
+        self._last_result = result
+        return result
@@ -1,65 +1,140 @@
 import random
 import time
-import pyautogui
 import pytweening
-from controllers.keyboard_controller import KeyboardController
-from pynput.keyboard import Key, Listener
+from controllers.input_hub import get_input_hub
+
+# Easing profiles per step count, shared by every MouseController
+_EASING_PROFILES = {}
+
+def get_easing_profile(steps):
+    """
+    Returns the easeInOutQuad progress values for 0..steps, computed once per step count.
+    """
+    profile = _EASING_PROFILES.get(steps)
+    if profile is None:
+        profile = tuple(pytweening.easeInOutQuad(i / steps) for i in range(steps + 1))
+        _EASING_PROFILES[steps] = profile
+    return profile
 
 class MouseController:
-    def __init__(self, main_controller, duration=0.2):
+    # Moves starting this close to a registered anchor reuse the anchor's cached path
+    ANCHOR_RADIUS = 4
+
+    def __init__(self, main_controller, duration=0.2, input_backend=None):
         """
         MouseController pentru gestionarea mișcărilor mouse-ului și a altor funcții legate de mouse.
         """
-        self.keyboard = KeyboardController()
+        self.keyboard = main_controller.keyboard
+        self.input = input_backend or self.keyboard.input  # Backend-ul de input (desktop sau simulat)
         self.main_controller = main_controller  # Referință la controller-ul principal
         self.duration = duration
-        pyautogui.PAUSE = 0  # Dezactivare pauză implicită între mișcări
+        self.click_delay = 0.1
+        self.stop_event = main_controller.stop_event  # Waits end as soon as the craft is stopped
+        self.stop_subscription = None  # Abonarea tastei de oprire la hub-ul de input
+
+        # Poziții fixe (stash, item) și traiectoriile precalculate între ele
+        self.anchors = []
+        self._path_cache = {}
         
     def check_stop_loop(self, stop_key):
         """
         Verifică dacă tasta de oprire a fost apăsată și oprește bucla.
+        Calling it again replaces the previous stop key instead of adding another listener;
+        an invalid key keeps the previous one.
         
         :param stop_key: Tasta configurată pentru oprirea buclei
+        :return: True dacă tasta este validă și ascultată
         """
         def on_press(key):
-            try:
-                if key == Key[stop_key]:
-                    self.main_controller.stop_loop = True
-                    print(f"{stop_key} apăsată, oprind bucla.")
-            except KeyError:
-                print(f"Error: Tasta '{stop_key}' este invalidă.")
-                
-        listener = Listener(on_press=on_press)
-        listener.start()
+            self.main_controller.stop_loop = True
+            print(f"{stop_key} apăsată, oprind bucla.")
+
+        try:
+            subscription = get_input_hub(self.input).subscribe(stop_key, on_press)
+        except ValueError:
+            print(f"Error: Tasta '{stop_key}' este invalidă.")
+            return False
+        self.stop_listening()
+        self.stop_subscription = subscription
+        return True
+
+    def stop_listening(self):
+        """
+        Anulează abonarea tastei de oprire.
+        """
+        if self.stop_subscription is not None:
+            self.stop_subscription.cancel()
+            self.stop_subscription = None
+
+    def register_anchors(self, positions):
+        """
+        Registers fixed screen positions (currency slots, item slot) whose paths are cached.
+
+        :param positions: Iterable of (x, y) positions
+        """
+        self.anchors = [(round(x), round(y)) for x, y in positions]
+        self._path_cache.clear()
+
+    def find_anchor(self, x, y):
+        for anchor_x, anchor_y in self.anchors:
+            if abs(anchor_x - x) <= self.ANCHOR_RADIUS and abs(anchor_y - y) <= self.ANCHOR_RADIUS:
+                return anchor_x, anchor_y
+        return None
+
+    def get_path(self, start_x, start_y, x, y, steps):
+        """
+        Returns the eased points of a move, cached when it starts at a registered anchor.
+        """
+        anchor = self.find_anchor(start_x, start_y)
+        key = (anchor, x, y, steps)
+        if anchor is not None:
+            path = self._path_cache.get(key)
+            if path is not None:
+                return path
+            start_x, start_y = anchor
+
+        dx, dy = x - start_x, y - start_y
+        path = tuple((start_x + t * dx, start_y + t * dy) for t in get_easing_profile(steps))
+        if anchor is not None:
+            self._path_cache[key] = path
+        return path
 
     def move(self, x, y, steps=30, variation=0, final_variation=2):
-        start_x, start_y = pyautogui.position()
+        start_x, start_y = self.input.position()
+        path = self.get_path(start_x, start_y, x, y, steps)
 
-        points = [(pytweening.easeInOutQuad(i / steps), pytweening.easeInOutQuad(i / steps)) for i in range(steps + 1)]
+        # Each step is scheduled against a deadline so the move lasts `duration`, not duration + sleep overshoot
+        step_duration = self.duration / steps
+        start_time = time.monotonic()
 
         for i in range(steps):
             if self.main_controller.stop_loop:
                 print("Mișcarea mouse-ului a fost oprită.")
                 return  # Ieșire din funcție dacă loop-ul este oprit
-            t = points[i][0] 
-            new_x = start_x + t * (x - start_x) + random.uniform(-variation, variation)
-            new_y = start_y + t * (y - start_y) + random.uniform(-variation, variation)
+            point_x, point_y = path[i]
+            if variation:
+                point_x += random.uniform(-variation, variation)
+                point_y += random.uniform(-variation, variation)
 
-            pyautogui.moveTo(new_x, new_y)
-            time.sleep(self.duration / steps) 
+            self.input.move_to(point_x, point_y)
+            remaining = start_time + (i + 1) * step_duration - time.monotonic()
+            if remaining > 0:
+                self.stop_event.wait(remaining)
 
         final_x = x + random.uniform(-final_variation, final_variation)
         final_y = y + random.uniform(-final_variation, final_variation)
-        pyautogui.moveTo(final_x, final_y)
+        self.input.move_to(final_x, final_y)
 
-    def click(self, button='left', delay=0.1):
+    def click(self, button='left', delay=None):
         """
         Efectuează un click cu mouse-ul.
         
         :param button: Butonul de click ('left' sau 'right')
+        :param delay: Pauza dinaintea click-ului (implicit click_delay)
         """
-        time.sleep(delay)
-        pyautogui.click(button=button, duration=0.1)
+        if self.stop_event.wait(self.click_delay if delay is None else delay):
+            return
+        self.input.click(button)
 
     def right_click(self):
         """
@@ -73,4 +148,4 @@ class MouseController:
         
         :param clicks: Numărul de unități de derulare (poate fi negativ pentru a derula în jos)
         """
-        pyautogui.scroll(clicks)
+        self.input.scroll(clicks)
@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open ended
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of floats that overwrites its oldest values.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = array('d', bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def get(self, position):
+        """Value at `position`, counted from the oldest one kept."""
+        start = self.index if self.count == self.capacity else 0
+        return self.values[(start + position) % self.capacity]
+
+    def to_list(self):
+        """Values from oldest to newest."""
+        if self.count < self.capacity:
+            return self.values[:self.count].tolist()
+        return self.values[self.index:].tolist() + self.values[:self.index].tolist()
+
+
+class _StageTimer:
+    __slots__ = ("telemetry", "stage", "start")
+
+    def __init__(self, telemetry, stage):
+        self.telemetry = telemetry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.telemetry.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class RollTelemetry:
+    """
+    Per-stage latency of craft rolls (mouse move, click, clipboard copy, parse, match).
+
+    The latest `capacity` samples of each stage are kept in a ring buffer for percentiles,
+    while the histogram counts cover the whole session.
+    """
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.samples = {}
+        self.histograms = {}
+        self.totals = {}
+        self.roll_times = RingBuffer(capacity)
+        self.started_at = time.time()
+        self.rolls = 0
+
+    def stage(self, name):
+        """Context manager timing one execution of a stage."""
+        return _StageTimer(self, name)
+
+    def record(self, stage, seconds):
+        buffer = self.samples.get(stage)
+        if buffer is None:
+            buffer = self.samples[stage] = RingBuffer(self.capacity)
+            self.histograms[stage] = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            self.totals[stage] = [0, 0.0]
+        milliseconds = seconds * 1000
+        buffer.append(milliseconds)
+        self.histograms[stage][bisect_left(HISTOGRAM_BOUNDS_MS, milliseconds)] += 1
+        totals = self.totals[stage]
+        totals[0] += 1
+        totals[1] += milliseconds
+
+    def roll_completed(self):
+        self.rolls += 1
+        self.roll_times.append(time.monotonic())
+
+    def rolls_per_minute(self, window=60.0):
+        """Rolls per minute over the last `window` seconds."""
+        times = self.roll_times
+        if len(times) < 2:
+            return 0.0
+        newest = times.get(len(times) - 1)
+        # Roll times are increasing, so the first roll inside the window is found by bisection
+        low, high = 0, len(times) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if newest - times.get(middle) > window:
+                low = middle + 1
+            else:
+                high = middle
+        elapsed = newest - times.get(low)
+        return (len(times) - 1 - low) * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def stage_summary(self, stage):
+        values = sorted(self.samples[stage].to_list())
+        count, total = self.totals[stage]
+
+        def percentile(fraction):
+            return values[min(len(values) - 1, int(len(values) * fraction))]
+
+        return {
+            "count": count,
+            "mean_ms": total / count,
+            "p50_ms": percentile(0.5),
+            "p90_ms": percentile(0.9),
+            "p99_ms": percentile(0.99),
+            "max_ms": values[-1],
+            "histogram": dict(zip([f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"],
+                                  self.histograms[stage])),
+        }
+
+    def summary(self):
+        return {stage: self.stage_summary(stage) for stage in self.samples}
+
+    def slowest_stage(self):
+        """Stage with the highest mean time per roll, or None before the first sample."""
+        if not self.totals:
+            return None
+        return max(self.totals, key=lambda stage: self.totals[stage][1] / max(self.rolls, 1))
+
+    def export(self, directory="logs", extra=None):
+        """Write the session summary to CSV and JSON files; returns their paths. `extra` is added to the JSON."""
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime("roll_telemetry_%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        csv_path = os.path.join(directory, name + ".csv")
+        json_path = os.path.join(directory, name + ".json")
+        summary = self.summary()
+
+        with open(csv_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+            for stage, data in summary.items():
+                writer.writerow([stage, data["count"]] + [round(data[key], 4) for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")])
+
+        with open(json_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "started_at": self.started_at,
+                "duration_s": time.time() - self.started_at,
+                "rolls": self.rolls,
+                "rolls_per_minute": self.rolls_per_minute(),
+                "stages": summary,
+                **(extra or {}),
+            }, file, indent=2)
+        return csv_path, json_path
@@ -1,14 +1,26 @@
+import time
+_STARTUP_BEGIN = time.perf_counter()
+
+import sys
 import tkinter as tk
 from tkinter import ttk
-import pyautogui
-from controllers.file_manager import FileManager
-from views.magic_craft_view import MagicCraftTab
-from views.rare_craft_view import RareCraftTab
-import sv_ttk
-import pywinstyles
-import pystray
-from pystray import MenuItem as item
-from PIL import Image
+from views.lazy_tab import LazyTab
+
+# Heavy or platform specific modules (pyautogui, pystray, PIL, pywinstyles, sv_ttk, the craft
+# controllers and the mod tables) are imported where they are first used, not at startup.
+_IMPORTS_DONE = time.perf_counter()
+
+class StartupTimer:
+    """Records the time from process start to each startup milestone."""
+    def __init__(self, begin):
+        self.begin = begin
+        self.marks = []
+
+    def mark(self, name, at=None):
+        self.marks.append((name, (at or time.perf_counter()) - self.begin))
+
+    def report(self):
+        return "Startup: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.marks)
 
 class Sidebar(tk.Frame):
     def __init__(self, parent):
@@ -16,23 +28,62 @@ class Sidebar(tk.Frame):
         self.pack_propagate(False)
 
 class MainApp(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, on_tab_built=None):
         super().__init__(parent)
-        file_manager = FileManager()
+        self.mod_database = None
+        self.on_tab_built = on_tab_built
+        self.ready = False  # Set once the window has been drawn
 
         # self.sidebar = Sidebar(self)
         # self.sidebar.pack(side="left", fill="y")
 
-        notebook = ttk.Notebook(self)
-        notebook.pack(expand=True, fill="both")
-
-        magic_tab = MagicCraftTab(notebook)
-        notebook.add(magic_tab, text="Magic Craft")
-
-        rare_tab = RareCraftTab(notebook)
-        notebook.add(rare_tab, text="Rare Craft")
-
-        sv_ttk.set_theme("dark", parent)
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(expand=True, fill="both")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Tabs are built the first time they are selected
+        self.notebook.add(LazyTab(self.notebook, self.create_magic_tab), text="Magic Craft")
+        self.notebook.add(LazyTab(self.notebook, self.create_rare_tab), text="Rare Craft")
+
+        set_theme(parent)
+
+    def show_tabs(self):
+        """Build the selected tab; called once the empty window has been drawn."""
+        self.ready = True
+        self.on_tab_changed()
+
+    def on_tab_changed(self, event=None):
+        if not self.ready:
+            return
+        tab = self.notebook.nametowidget(self.notebook.select())
+        if tab.content is None:
+            tab.build()
+            if self.on_tab_built:
+                self.on_tab_built(tab)
+
+    def get_mod_database(self):
+        """Loads the mod tables on first use."""
+        if self.mod_database is None:
+            from controllers.file_manager import FileManager
+            from controllers.mod_database import ModDatabase
+            self.mod_database = ModDatabase(FileManager()).load()
+        return self.mod_database
+
+    def create_magic_tab(self, parent):
+        from views.magic_craft_view import MagicCraftTab
+        return MagicCraftTab(parent, self.get_mod_database())
+
+    def create_rare_tab(self, parent):
+        from views.rare_craft_view import RareCraftTab
+        return RareCraftTab(parent, self.get_mod_database())
+
+def set_theme(root):
+    import sv_ttk
+    sv_ttk.set_theme("dark", root)
+
+def set_header_color(root):
+    import pywinstyles
+    pywinstyles.change_header_color(root, color="#1c1c1c")
 
 def minimize_to_tray(root):
     hide_window(root)
@@ -51,6 +102,10 @@ def on_closing(root, icon=None):
     root.destroy()
 
 def create_tray_icon(root):
+    import pystray
+    from pystray import MenuItem as item
+    from PIL import Image
+
     icon_image = Image.open('assets/icon.ico').resize((24, 24))
 
     menu = (item('Open Application', lambda: show_window(icon, root)),
@@ -60,19 +115,39 @@ def create_tray_icon(root):
     icon.run()
 
 def main():
+    # --startup-time prints the startup milestones and exits once the first tab is built
+    measure_only = "--startup-time" in sys.argv
+    timer = StartupTimer(_STARTUP_BEGIN)
+    timer.mark("imports", _IMPORTS_DONE)
+
     root = tk.Tk()
-    
+
     root.wm_attributes("-topmost", 1)
 
     root.title("Crafting App")
     root.geometry("600x700")
     # root.resizable(0, 0)
 
-    pyautogui.PAUSE = 0
-    pywinstyles.change_header_color(root, color="#1c1c1c")
+    set_header_color(root)
+
+    def on_tab_built(tab):
+        if len(timer.marks) > 2:
+            return
+        timer.mark("first tab")
+        print(timer.report())
+        if measure_only:
+            root.destroy()
+
+    app = MainApp(root, on_tab_built=on_tab_built)
+    app.pack(expand=True, fill="both")
+
+    def on_first_paint():
+        root.update_idletasks()
+        timer.mark("first paint")
+        app.show_tabs()
+
+    root.after_idle(on_first_paint)
 
-    MainApp(root).pack(expand=True, fill="both")
-    
     # root.protocol("WM_DELETE_WINDOW", lambda: minimize_to_tray(root))
 
     root.mainloop()
@@ -0,0 +1,15 @@
+from tkinter import ttk
+
+class LazyTab(ttk.Frame):
+    """Notebook page that builds its content with `factory(self)` the first time it is selected."""
+    def __init__(self, parent, factory):
+        super().__init__(parent)
+        self.factory = factory
+        self.content = None
+
+    def build(self):
+        """Create the tab content once; later calls return the existing widget."""
+        if self.content is None:
+            self.content = self.factory(self)
+            self.content.pack(expand=True, fill="both")
+        return self.content
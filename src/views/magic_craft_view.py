@@ -1,32 +1,84 @@
 import tkinter as tk
-import pygetwindow as gw
 from tkinter import ttk, messagebox
-from controllers.file_manager import FileManager
+from controllers.mod_database import ModDatabase
 from controllers.mod_parser import ModParser 
 from controllers.craft_controllers.magic_craft_controller import MagicCraftController 
+from controllers.craft_controllers.craft_worker import CraftWorker
+from controllers.craft_controllers.batch_craft_controller import BatchCraftController
+from controllers.craft_probability import CraftProbability
+from controllers.config_service import get_config_service
+
+FILTER_DEBOUNCE_MS = 150
+PROGRESS_POLL_MS = 50
 
 class MagicCraftTab(tk.PanedWindow):
-    def __init__(self, parent):
+    def __init__(self, parent, mod_database=None):
         super().__init__(parent, orient="vertical")
         self.parent = parent
 
         self.prefix_count = 0
         self.suffix_count = 0
 
-        # Initialize controllers
-        self.magic_craft_controller = MagicCraftController()
-        self.file_manager = FileManager()
+        # Craft controllers start input listeners, so they are created when crafting starts
+        self._magic_craft_controller = None
+        self._craft_worker = None
+        self._batch_craft_controller = None
+        self.mod_database = mod_database or ModDatabase().load()
+        self.craft_probability = CraftProbability(self.mod_database)
         self.mod_parser = ModParser()
 
         # Variables and Data
         self.selected_mod_type = None
+        self.mod_table = None
         self.mod_data = []
+        self._filter_job = None
+        self.filtered_rows = []
+        self._last_sort_column = None
+        self._sort_descending = False
+
+        # Tree items are created once per table row and then only reordered or detached
+        self._materialized_rows = set()
+        self._shown_rows = ()
+
+        # Selected mods live in the model, keyed by tree item id, not in the widget
+        self.selected_mods = {}
 
         # Create panes
         self.create_panes()
         self.load_mod_files()
         self.create_craft_button()
+        self.create_estimate_section()
     
+    @property
+    def magic_craft_controller(self):
+        if self._magic_craft_controller is None:
+            self._magic_craft_controller = MagicCraftController(mod_database=self.mod_database)
+        return self._magic_craft_controller
+
+    @property
+    def max_retries(self):
+        config_service = get_config_service()
+        config_service.check_for_changes()  # Throttled; picks up edits made while idle
+        return config_service.options["max_retries"]
+
+    @property
+    def craft_worker(self):
+        if self._craft_worker is None:
+            self._craft_worker = CraftWorker(self.magic_craft_controller)
+        return self._craft_worker
+
+    @property
+    def batch_craft_controller(self):
+        if self._batch_craft_controller is None:
+            self._batch_craft_controller = BatchCraftController(self.magic_craft_controller)
+        return self._batch_craft_controller
+
+    def destroy(self):
+        """Stop the craft and release the stop key subscription along with the tab."""
+        if self._magic_craft_controller is not None:
+            self._magic_craft_controller.close()
+        super().destroy()
+
     def create_panes(self):
         """Create and add the panes."""
         self.pane_1 = ttk.Frame(self)
@@ -96,9 +148,45 @@ class MagicCraftTab(tk.PanedWindow):
         start_button = ttk.Button(button_frame, text="Start Craft", command=self.start_crafting)
         start_button.pack(side='left', padx=5, pady=5)
 
+        batch_button = ttk.Button(button_frame, text="Batch Craft", command=self.start_batch_crafting)
+        batch_button.pack(side='left', padx=5, pady=5)
+
+        stop_button = ttk.Button(button_frame, text="Stop", command=self.stop_crafting)
+        stop_button.pack(side='left', padx=5, pady=5)
+
         check_functionality = ttk.Button(button_frame, text="Check Functionality", command=self.check_functionality)
         check_functionality.pack(side='left', padx=5, pady=5)
+
+        self.status_var = tk.StringVar(value="Idle")
+        status_label = tk.Label(button_frame, textvariable=self.status_var, font=("Arial", 10))
+        status_label.pack(side='right', padx=5, pady=5)
         
+    def create_estimate_section(self):
+        """Create the item level input and the expected cost estimate."""
+        estimate_frame = ttk.Frame(self)
+        estimate_frame.pack(side="bottom", fill="x", padx=5)
+
+        label = tk.Label(estimate_frame, text="Item Level", font=("Arial", 10))
+        label.pack(side='left', padx=5)
+
+        self.item_level_var = tk.IntVar(value=84)
+        self.item_level_var.trace_add('write', self.update_odds)
+        item_level_input = ttk.Spinbox(estimate_frame, from_=1, to=100, width=5, textvariable=self.item_level_var)
+        item_level_input.pack(side='left', padx=5)
+
+        estimate_button = ttk.Button(estimate_frame, text="Estimate Cost", command=self.estimate_cost)
+        estimate_button.pack(side='left', padx=5)
+
+        self.estimate_var = tk.StringVar(value="")
+        estimate_label = tk.Label(estimate_frame, textvariable=self.estimate_var, font=("Arial", 10))
+        estimate_label.pack(side='left', padx=5)
+
+        odds_frame = ttk.Frame(self)
+        odds_frame.pack(side="bottom", fill="x", padx=5)
+        self.odds_var = tk.StringVar(value="")
+        odds_label = tk.Label(odds_frame, textvariable=self.odds_var, font=("Arial", 10))
+        odds_label.pack(side='left', padx=5)
+
     def set_column_widths(self):
         """Set dynamic column widths based on treeview size."""
         mod_width = int(self.mod_tree.winfo_width() * 0.7)
@@ -119,7 +207,7 @@ class MagicCraftTab(tk.PanedWindow):
     # Loaders and Updaters
     def load_mod_files(self):
         """Load mod file names into the combobox."""
-        self.mod_files = self.file_manager.list_files()
+        self.mod_files = self.mod_database.list_tables()
         self.mod_type_select['values'] = self.mod_files
         self.mod_type_select.current(0)
         self.load_mods()
@@ -129,40 +217,81 @@ class MagicCraftTab(tk.PanedWindow):
         try:
             selected_file = self.mod_type_select.get()
             self.selected_mod_type = 'prefix' if 'prefix' in selected_file.lower() else 'suffix' if 'suffix' in selected_file.lower() else None
-            self.mod_data = self.file_manager.load_mods_from_file(selected_file)
-            self.update_mod_tree(self.mod_data)
+            self.mod_table = self.mod_database.get_table(selected_file)
+            self.mod_data = self.mod_table.records()
+            self._last_sort_column = None
+            self.apply_filter()
         except FileNotFoundError as e:
             messagebox.showerror("File Error", str(e))
             
-    def update_mod_tree(self, mod_data):
-        """Update the tree view with new mod data."""
-        self.mod_tree.delete(*self.mod_tree.get_children())
-        for mod in mod_data:
-            self.mod_tree.insert('', tk.END, values=(mod['Mod'], mod['Tag'], mod['iLvl'], mod['Weight']))
+    def row_iid(self, row):
+        """Tree item id of a row of the current mod table."""
+        return f"{self.mod_table.name}:{row}"
+
+    def update_mod_tree(self, rows):
+        """Show the given table rows in order, reusing tree items instead of re-inserting them."""
+        iids = []
+        for row in rows:
+            iid = self.row_iid(row)
+            if iid not in self._materialized_rows:
+                mod = self.mod_data[row]
+                self.mod_tree.insert('', tk.END, iid=iid, values=(mod['Mod'], mod['Tag'], mod['iLvl'], mod['Weight']))
+                self._materialized_rows.add(iid)
+            iids.append(iid)
+
+        iids = tuple(iids)
+        if iids != self._shown_rows:
+            # One Tk call reorders the shown items and detaches everything else
+            self.mod_tree.set_children('', *iids)
+            self._shown_rows = iids
 
     def filter_mods(self, *args):
-        """Filter mods based on the search entry."""
-        search_term = self.mod_search_var.get().lower()
-        filtered_mods = [mod for mod in self.mod_data if search_term in mod['Mod'].lower() or search_term in mod['Tag'].lower()]
-        self.update_mod_tree(filtered_mods)
+        """Schedule filtering; a burst of keystrokes runs a single search."""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DEBOUNCE_MS, self.apply_filter)
+
+    def apply_filter(self):
+        """Filter mods based on the search entry using the table's search index."""
+        self._filter_job = None
+        if self.mod_table is None:
+            return
+        self.filtered_rows = self.mod_table.get_search_index().search(self.mod_search_var.get())
+        self.update_mod_tree(self.sorted_rows(self.filtered_rows))
             
     # Event Handlers
     def on_mod_double_click(self, event):
         """Handle mod selection on double-click."""
         selected_item = self.mod_tree.selection()
         if selected_item:
-            mod_values = self.mod_tree.item(selected_item)['values']
+            iid = selected_item[0]
+            mod = self.mod_data[int(iid.rsplit(':', 1)[1])]
+            mod_values = (mod['Mod'], mod['Tag'], mod['iLvl'], mod['Weight'])
             if not self.check_mod_limits(mod_values):
                 return
-            if self.check_duplicate_mod(mod_values):
+            if self.check_duplicate_mod(iid):
                 return
-            self.selected_mod_tree.insert('', tk.END, values=mod_values)
+            self.selected_mods[iid] = (mod, self.selected_mod_type)
+            self.update_affix_counts(self.selected_mod_type, 1)
+            self.selected_mod_tree.insert('', tk.END, iid=iid, values=mod_values)
+            self.update_odds()
 
     def remove_selected_mod(self, event):
         """Remove mod from selected mods."""
         selected_item = self.selected_mod_tree.selection()
         if selected_item:
-            self.selected_mod_tree.delete(selected_item)
+            for iid in selected_item:
+                _, mod_type = self.selected_mods.pop(iid)
+                self.update_affix_counts(mod_type, -1)
+            self.selected_mod_tree.delete(*selected_item)
+            self.update_odds()
+
+    def update_affix_counts(self, mod_type, delta):
+        """Keep the prefix/suffix counters in sync with the selected mods."""
+        if mod_type == 'prefix':
+            self.prefix_count += delta
+        elif mod_type == 'suffix':
+            self.suffix_count += delta
 
     def check_mod_limits(self, mod_values):
         """Check if mod limits are reached for prefixes or suffixes."""
@@ -174,51 +303,137 @@ class MagicCraftTab(tk.PanedWindow):
             return False
         return True
 
-    def check_duplicate_mod(self, mod_values):
+    def check_duplicate_mod(self, iid):
         """Check for duplicate mods in the selected mods list."""
-        for item in self.selected_mod_tree.get_children():
-            if self.selected_mod_tree.item(item)['values'] == mod_values:
-                messagebox.showerror("Duplicate Mod", "This mod has already been added.")
-                return True
+        if iid in self.selected_mods:
+            messagebox.showerror("Duplicate Mod", "This mod has already been added.")
+            return True
         return False
     
     def sort_mods_by_column(self, column, treeview):
-        """Sort mods by the selected column."""
+        """Sort the filtered mods by the selected column."""
         # Determine sort direction (toggle between ascending and descending)
-        if hasattr(self, '_last_sort_column') and self._last_sort_column == column:
+        if self._last_sort_column == column:
             self._sort_descending = not self._sort_descending
         else:
             self._sort_descending = False
         
         self._last_sort_column = column
+        self.update_mod_tree(self.sorted_rows(self.filtered_rows))
 
-        # Sort the mod data
-        sorted_data = sorted(self.mod_data, 
-                            key=lambda mod: mod[column].lower() if isinstance(mod[column], str) else mod[column],
-                            reverse=self._sort_descending)
-
-        # Clear and insert sorted mods
-        treeview.delete(*treeview.get_children())
-        for mod in sorted_data:
-            treeview.insert('', tk.END, values=(mod['Mod'], mod['Tag'], mod['iLvl'], mod['Weight']))
+    def sorted_rows(self, rows):
+        """Order rows by the active sort column using the table's cached permutation."""
+        if self._last_sort_column is None:
+            return rows
+        order = self.mod_table.sort_order(self._last_sort_column, self._sort_descending)
+        if len(rows) == len(order):
+            return order
+        visible = set(rows)
+        return [row for row in order if row in visible]
 
     # Crafting Logic
     def get_item_mods(self):
-        """Get selected mods from the tree view."""
-        children = self.selected_mod_tree.get_children()
-        return [self.selected_mod_tree.item(child)['values'][0] for child in children]
+        """Get selected mods from the model."""
+        return [mod['Mod'] for mod, _ in self.selected_mods.values()]
     
-    def start_crafting(self):
+    def get_selected_mod_file(self):
+        """Mod file the selected mods come from, used to pair prefix and suffix tables."""
+        for iid in self.selected_mods:
+            return iid.rsplit(':', 1)[0]
+        return self.mod_type_select.get()
+
+    def get_item_level(self):
+        try:
+            return int(self.item_level_var.get())
+        except (tk.TclError, ValueError):
+            return 84
+
+    def update_odds(self, *args):
+        """Show the exact hit chances for the selected mods; memoized, so cheap on every change."""
+        selected_mods = self.get_item_mods()
+        if not selected_mods:
+            self.odds_var.set("")
+            return
+
+        odds = self.craft_probability.odds(self.get_selected_mod_file(), self.get_item_level(), selected_mods)
+        if not odds.attempt_chance:
+            self.odds_var.set("Not reachable with alterations.")
+            return
+        self.odds_var.set(f"Alteration {odds.alteration_chance:.2%} | Augmentation {odds.augmentation_chance:.2%} | "
+                          f"Expected rolls {odds.expected_rolls:.0f} | "
+                          f"Within {self.max_retries} rolls {odds.chance_within(self.max_retries):.1%}")
+
+    def estimate_cost(self):
+        """Simulate the craft with the selected mods and show the expected currency cost."""
+        selected_mods = self.get_item_mods()
+        if not selected_mods:
+            messagebox.showerror("No Mods", "No mods selected for crafting.")
+            return
+        try:
+            from controllers.craft_simulator import CraftSimulator
+        except ImportError:  # numpy is optional; the cost estimate is disabled without it
+            self.estimate_var.set("Install numpy to estimate costs.")
+            return
+
+        simulator = CraftSimulator(self.mod_database, self.get_selected_mod_file(), self.get_item_level(), selected_mods)
+        result = simulator.simulate()
+        if not result.sessions:
+            self.estimate_var.set("Not reachable with alterations.")
+            return
+        self.estimate_var.set(f"Rolls: mean {result.mean_rolls:.0f}, p50 {result.p50:.0f}, "
+                              f"p90 {result.p90:.0f}, p99 {result.p99:.0f}")
+
+    def start_batch_crafting(self):
+        """Craft every cell of the stash item grid."""
+        if not self.batch_craft_controller.grid:
+            messagebox.showerror("Batch Craft", "No item_grid configured in config/stash.json.")
+            return
+        self.start_crafting(craft=self.batch_craft_controller.start_batch_craft)
+
+    def start_crafting(self, craft=None):
         """Start the crafting process."""
         selected_mods = self.get_item_mods()
         if not selected_mods:
             messagebox.showerror("No Mods", "No mods selected for crafting.")
             return
+        if self.craft_worker.is_running():
+            messagebox.showerror("Crafting", "A craft session is already running.")
+            return
+        self.magic_craft_controller.set_mod_file(self.get_selected_mod_file())
         self.focus_poe_window()
-        try:
-            self.magic_craft_controller.start_magic_craft(selected_mods=selected_mods)
-        except Exception as e:
-            messagebox.showerror("Crafting Error", f"An error occurred during crafting: {str(e)}")
+        self.craft_worker.start(selected_mods, craft)
+        self.status_var.set("Crafting...")
+        self.after(PROGRESS_POLL_MS, self.poll_craft_progress)
+
+    def stop_crafting(self):
+        """Ask the running craft session to stop."""
+        if self._craft_worker is not None:
+            self._craft_worker.cancel()
+
+    def poll_craft_progress(self):
+        """Drain the worker's progress queue on the Tk thread and update the status line."""
+        for update in self.craft_worker.drain():
+            status = update["status"]
+            if status == "started":
+                self.status_var.set(f"Rolling... 0/{update['max_rolls']}")
+            elif status == "rolling":
+                self.status_var.set(f"Rolling... {update['rolls']}/{update['max_rolls']} | "
+                                    f"{update['rolls_per_minute']:.0f} rolls/min | slowest: {update['slowest_stage']}")
+            elif status == "batch":
+                self.status_var.set(f"Batch: cell {update['done'] + 1}/{update['total']}")
+            elif status == "finished":
+                result = update["result"]
+                if isinstance(result, dict):
+                    crafted = sum(1 for value in result.values() if value)
+                    self.status_var.set(f"Batch done: {crafted}/{len(result)} cells match.")
+                else:
+                    self.status_var.set("Mods match! Crafting successful." if result else "Stopped - no matching mods.")
+            elif status == "error":
+                self.status_var.set("Crafting error.")
+                messagebox.showerror("Crafting Error", f"An error occurred during crafting: {update['error']}")
+
+        if self.craft_worker.is_running() or not self.craft_worker.progress.empty():
+            self.after(PROGRESS_POLL_MS, self.poll_craft_progress)
             
     def check_functionality(self):
         """Check functionality by focusing the window and testing the controller."""
@@ -227,6 +442,7 @@ class MagicCraftTab(tk.PanedWindow):
 
     def focus_poe_window(self):
         """Focus the Path of Exile window."""
+        import pygetwindow as gw
         windows = gw.getWindowsWithTitle('Path of Exile')
         if windows:
             windows[0].activate()
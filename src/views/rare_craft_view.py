@@ -1,16 +1,189 @@
 import tkinter as tk
+from tkinter import ttk, messagebox
+from controllers.mod_parser import ModParser
+from controllers.mod_filter import FilterSyntaxError, compile_filter
+from controllers.craft_controllers.rare_craft_controller import RareCraftController
+from controllers.craft_controllers.craft_worker import CraftWorker
+
+FILTER_CHECK_DEBOUNCE_MS = 300
+PROGRESS_POLL_MS = 50
+
+FILTER_HELP = (
+    'Quote mods and combine them with AND, OR, NOT and COUNT(...) >= n.\n'
+    'Conditions per mod: [tier <= 2], [value >= 15], [weight < 500], [prefix], [suffix].\n'
+    'Example: COUNT("increased Fire Damage", "increased Cold Damage") >= 2 AND NOT "Chaos"'
+)
 
 class RareCraftTab(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, mod_database=None):
         super().__init__(parent)
+        self.mod_database = mod_database
+
+        # The craft controller starts input listeners, so it is created when crafting starts
+        self._rare_craft_controller = None
+        self._craft_worker = None
+        self.mod_parser = ModParser(mod_database)
+        self.mod_filter = None
+        self._check_job = None
+
+        self.create_filter_section()
+        self.create_craft_buttons()
+
+    @property
+    def rare_craft_controller(self):
+        if self._rare_craft_controller is None:
+            self._rare_craft_controller = RareCraftController(mod_database=self.mod_database)
+        return self._rare_craft_controller
+
+    @property
+    def craft_worker(self):
+        if self._craft_worker is None:
+            self._craft_worker = CraftWorker(self.rare_craft_controller)
+        return self._craft_worker
+
+    def destroy(self):
+        """Stop the craft and release the stop key subscription along with the tab."""
+        if self._rare_craft_controller is not None:
+            self._rare_craft_controller.close()
+        super().destroy()
+
+    def create_filter_section(self):
+        """Create the base type selection, the filter expression input and its live syntax check."""
+        base_frame = tk.Frame(self)
+        base_frame.pack(anchor='w', padx=5, pady=5, fill='x')
+        base_label = tk.Label(base_frame, text="Mod Type", font=("Arial", 12))
+        base_label.pack(side='left', padx=5, pady=5)
+
+        # Mod file of the crafted base type; tier and weight conditions use its rows
+        self.mod_type_select = ttk.Combobox(base_frame, state="readonly")
+        self.mod_type_select.pack(side='right')
+        if self.mod_database is not None:
+            self.mod_type_select['values'] = self.mod_database.list_tables()
+            if self.mod_type_select['values']:
+                self.mod_type_select.current(0)
+
+        label = tk.Label(self, text="Mod Filter", font=("Arial", 12))
+        label.pack(anchor='w', padx=5, pady=5)
+
+        self.filter_text = tk.Text(self, height=8, wrap='word')
+        self.filter_text.pack(fill='both', expand=True, padx=5, pady=5)
+        self.filter_text.bind("<<Modified>>", self.on_filter_modified)
+
+        help_label = tk.Label(self, text=FILTER_HELP, font=("Arial", 9), justify='left')
+        help_label.pack(anchor='w', padx=5)
+
+        self.filter_status_var = tk.StringVar(value="")
+        filter_status = tk.Label(self, textvariable=self.filter_status_var, font=("Arial", 10))
+        filter_status.pack(anchor='w', padx=5, pady=5)
+
+    def create_craft_buttons(self):
+        """Create the craft buttons and the status line."""
+        button_frame = ttk.Frame(self)
+        button_frame.pack(side="bottom", fill="x", padx=5, pady=5)
+
+        start_button = ttk.Button(button_frame, text="Start Craft", command=self.start_crafting)
+        start_button.pack(side='left', padx=5, pady=5)
+
+        stop_button = ttk.Button(button_frame, text="Stop", command=self.stop_crafting)
+        stop_button.pack(side='left', padx=5, pady=5)
+
+        test_button = ttk.Button(button_frame, text="Test Clipboard Item", command=self.test_clipboard_item)
+        test_button.pack(side='left', padx=5, pady=5)
+
+        self.status_var = tk.StringVar(value="Idle")
+        status_label = tk.Label(button_frame, textvariable=self.status_var, font=("Arial", 10))
+        status_label.pack(side='right', padx=5, pady=5)
+
+    # Filter
+    def get_selected_mod_file(self):
+        return self.mod_type_select.get() or None
+
+    def get_expression(self):
+        return self.filter_text.get("1.0", tk.END).strip()
+
+    def on_filter_modified(self, event=None):
+        """Schedule a syntax check; a burst of keystrokes compiles the filter once."""
+        self.filter_text.edit_modified(False)
+        if self._check_job is not None:
+            self.after_cancel(self._check_job)
+        self._check_job = self.after(FILTER_CHECK_DEBOUNCE_MS, self.compile_expression)
+
+    def compile_expression(self):
+        """Compile the filter and show the result; returns the ModFilter or None."""
+        self._check_job = None
+        expression = self.get_expression()
+        if not expression:
+            self.mod_filter = None
+            self.filter_status_var.set("")
+            return None
+        try:
+            self.mod_filter = compile_filter(expression)
+        except FilterSyntaxError as e:
+            self.mod_filter = None
+            self.filter_status_var.set(f"Syntax error: {e}")
+            return None
+        self.filter_status_var.set(f"Filter OK: {len(self.mod_filter.leaves)} mod(s).")
+        return self.mod_filter
+
+    def test_clipboard_item(self):
+        """Check the item currently in the clipboard (Ctrl+Alt+C in game) against the filter."""
+        mod_filter = self.compile_expression()
+        if mod_filter is None:
+            messagebox.showerror("Mod Filter", "Enter a valid filter first.")
+            return
+        try:
+            item_text = self.clipboard_get()
+        except tk.TclError:
+            messagebox.showerror("Clipboard", "The clipboard has no item text.")
+            return
+        self.mod_parser.set_mod_file(self.get_selected_mod_file())
+        item = self.mod_parser.parse_item(item_text)
+        if not item.mods:
+            self.status_var.set("No mods found in the clipboard text.")
+            return
+        self.status_var.set("Clipboard item matches." if mod_filter.matches(item) else "Clipboard item does not match.")
+
+    # Crafting Logic
+    def start_crafting(self):
+        """Start crafting the item slot until it matches the filter."""
+        if self.compile_expression() is None:
+            messagebox.showerror("Mod Filter", "Enter a valid filter first.")
+            return
+        if self.craft_worker.is_running():
+            messagebox.showerror("Crafting", "A craft session is already running.")
+            return
+        self.rare_craft_controller.set_mod_file(self.get_selected_mod_file())
+        self.focus_poe_window()
+        self.craft_worker.start(self.get_expression(), self.rare_craft_controller.start_rare_craft)
+        self.status_var.set("Crafting...")
+        self.after(PROGRESS_POLL_MS, self.poll_craft_progress)
+
+    def stop_crafting(self):
+        """Ask the running craft session to stop."""
+        if self._craft_worker is not None:
+            self._craft_worker.cancel()
 
-        # Etichetă și buton pentru Magic Craft
-        self.label = tk.Label(self, text="Magic Crafting Options")
-        self.label.pack(pady=10)
+    def poll_craft_progress(self):
+        """Drain the worker's progress queue on the Tk thread and update the status line."""
+        for update in self.craft_worker.drain():
+            status = update["status"]
+            if status == "started":
+                self.status_var.set(f"Rolling... 0/{update['max_rolls']}")
+            elif status == "rolling":
+                self.status_var.set(f"Rolling... {update['rolls']}/{update['max_rolls']} | "
+                                    f"{update['rolls_per_minute']:.0f} rolls/min")
+            elif status == "finished":
+                self.status_var.set("Mods match! Crafting successful." if update["result"] else "Stopped - no matching mods.")
+            elif status == "error":
+                self.status_var.set("Crafting error.")
+                messagebox.showerror("Crafting Error", f"An error occurred during crafting: {update['error']}")
 
-        self.button = tk.Button(self, text="Start Magic Craft", command=self.start_magic_craft)
-        self.button.pack(pady=10)
+        if self.craft_worker.is_running() or not self.craft_worker.progress.empty():
+            self.after(PROGRESS_POLL_MS, self.poll_craft_progress)
 
-    def start_magic_craft(self):
-        # Aici vei pune logica de craft magic (de exemplu, control mouse/tastatură)
-        print("Magic Craft started!")
+    def focus_poe_window(self):
+        """Focus the Path of Exile window."""
+        import pygetwindow as gw
+        windows = gw.getWindowsWithTitle('Path of Exile')
+        if windows:
+            windows[0].activate()
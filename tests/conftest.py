@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from src/ (imports like `from controllers.x import Y`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
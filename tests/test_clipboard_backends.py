@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+
+from controllers import clipboard_backends
+from controllers.clipboard_backends import TkClipboardBackend
+
+
+class FakeTk:
+    """Hidden Tk root stand-in that records which threads use it."""
+    instances = []
+
+    def __init__(self):
+        self.text = None
+        self.threads = {threading.get_ident()}
+        self.destroyed = False
+        FakeTk.instances.append(self)
+
+    def _use(self):
+        self.threads.add(threading.get_ident())
+
+    def withdraw(self):
+        self._use()
+
+    def update(self):
+        self._use()
+
+    def update_idletasks(self):
+        self._use()
+
+    def clipboard_get(self):
+        self._use()
+        if self.text is None:
+            raise clipboard_backends.tk.TclError("CLIPBOARD selection doesn't exist")
+        return self.text
+
+    def clipboard_clear(self):
+        self._use()
+        self.text = None
+
+    def clipboard_append(self, text):
+        self._use()
+        self.text = (self.text or "") + text
+
+    def destroy(self):
+        self._use()
+        self.destroyed = True
+
+
+@pytest.fixture
+def fake_tk(monkeypatch):
+    FakeTk.instances = []
+    monkeypatch.setattr(clipboard_backends.tk, "Tk", FakeTk)
+    return FakeTk
+
+
+def test_one_interpreter_on_one_thread_serves_every_caller(fake_tk):
+    backend = TkClipboardBackend()
+    assert backend.paste() == ''
+
+    def craft_session(index):
+        backend.copy(f"item {index}")
+        backend.paste()
+
+    sessions = [threading.Thread(target=craft_session, args=(index,)) for index in range(5)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+
+    backend.copy("item text")
+    assert backend.paste() == "item text"
+    assert len(fake_tk.instances) == 1
+    assert len(fake_tk.instances[0].threads) == 1
+    assert threading.get_ident() not in fake_tk.instances[0].threads
+
+    backend.close()
+    assert fake_tk.instances[0].destroyed
+
+
+def test_close_without_use(fake_tk):
+    backend = TkClipboardBackend()
+    backend.close()
+    assert not fake_tk.instances
+    with pytest.raises(RuntimeError):
+        backend.paste()
+    assert not fake_tk.instances
+
+
+def test_calls_after_close_are_rejected(fake_tk):
+    backend = TkClipboardBackend()
+    backend.copy("a")
+    backend.close()
+    with pytest.raises(RuntimeError):
+        backend.copy("b")
+    backend.close()
+    assert [root.destroyed for root in fake_tk.instances] == [True]
+
+
+def test_event_errors_do_not_stop_the_clipboard_thread(fake_tk, monkeypatch, capsys):
+    failures = []
+
+    def failing_update(root):
+        failures.append(root)
+        raise clipboard_backends.tk.TclError("bad window path name")
+
+    monkeypatch.setattr(FakeTk, "update", failing_update)
+    monkeypatch.setattr(clipboard_backends, "TK_EVENT_INTERVAL", 0.001)
+    backend = TkClipboardBackend()
+    backend.copy("item text")
+    while len(failures) < 3:
+        threading.Event().wait(0.001)
+
+    assert backend.paste() == "item text"
+    backend.close()
+    assert capsys.readouterr().out.count("bad window path name") == 1
+
+
+def test_a_stuck_clipboard_thread_times_out(fake_tk, monkeypatch):
+    monkeypatch.setattr(clipboard_backends, "TK_CALL_TIMEOUT", 0.05)
+    backend = TkClipboardBackend()
+    release = threading.Event()
+    with pytest.raises(TimeoutError):
+        backend._call(lambda root: release.wait())
+    release.set()
+    assert backend.paste() == ''
+    backend.close()
+
+
+def test_requests_queued_behind_close_are_failed(fake_tk):
+    backend = TkClipboardBackend()
+    started, release = threading.Event(), threading.Event()
+    blocked = threading.Thread(target=backend._call, args=(lambda root: started.set() or release.wait(),))
+    blocked.start()
+    started.wait()
+
+    requests = backend._requests
+    closing = threading.Thread(target=backend.close)
+    closing.start()
+    while requests.empty():
+        threading.Event().wait(0.001)
+    # A request that slipped in after the stop sentinel is answered, not left waiting
+    late, done = {}, threading.Event()
+    requests.put((lambda root: "served", late, done))
+
+    release.set()
+    blocked.join()
+    closing.join()
+    assert done.wait(1.0)
+    assert isinstance(late["error"], RuntimeError)
+
+
+def test_startup_errors_reach_the_caller(monkeypatch):
+    def no_display():
+        raise clipboard_backends.tk.TclError("no display name")
+
+    monkeypatch.setattr(clipboard_backends.tk, "Tk", no_display)
+    backend = TkClipboardBackend()
+    with pytest.raises(clipboard_backends.tk.TclError):
+        backend.paste()
+    with pytest.raises(clipboard_backends.tk.TclError):
+        backend.copy("text")
+    backend.close()
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from controllers.config_service import ConfigService, validate_options, validate_stash
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def service(tmp_path):
+    options_path = tmp_path / "options.json"
+    stash_path = tmp_path / "stash.json"
+    options_path.write_text(json.dumps({"max_retries": 7}))
+    stash_path.write_text(json.dumps(read_json(os.path.join(ROOT, "config", "stash.json"))))
+    return ConfigService(str(options_path), str(stash_path), poll_interval=0)
+
+
+def rewrite(path, text):
+    """Write `text` and move the mtime forward so the change is seen even on coarse clocks."""
+    stat = os.stat(path)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_notifies_subscribers(service, tmp_path):
+    assert service.options["max_retries"] == 7
+    changes = []
+    service.subscribe(changes.append)
+
+    rewrite(tmp_path / "options.json", json.dumps({"max_retries": 9}))
+    assert service.check_for_changes() == {"options"}
+    assert service.options["max_retries"] == 9
+    assert changes == [{"options"}]
+
+
+@pytest.mark.parametrize("name, text", [
+    ("stash.json", "[]"),
+    ("stash.json", '{"main_currency": [1, 2, 3, 4, 5, 6, 7, 8, 9], "item_slot": {"position": [0, 0]}}'),
+    ("stash.json", '{"main_currency": []}'),
+    ("stash.json", "{not json"),
+    ("options.json", "[]"),
+    ("options.json", '"f3"'),
+])
+def test_invalid_reload_keeps_the_previous_config(service, tmp_path, name, text):
+    stash, options = service.stash, service.options
+    rewrite(tmp_path / name, text)
+
+    assert service.check_for_changes() == set()
+    assert service.stash is stash and service.options is options
+
+
+@pytest.mark.parametrize("key", ["max_retries", "item_cache_size"])
+def test_negative_counts_use_the_default(key):
+    assert validate_options({key: -1})[key] == validate_options({})[key]
+
+
+def test_wrong_types_use_the_default():
+    options = validate_options({"max_retries": "3", "hold_shift_currency": 1, "execution_delays": {"mouse_speed": 1}})
+    assert options["max_retries"] == 3 and options["hold_shift_currency"] is False
+    assert options["execution_delays"]["mouse_speed"] == 1.0
+
+
+def test_item_grid_is_validated():
+    stash = read_json(os.path.join(ROOT, "config", "stash.json"))
+    stash["item_grid"] = {"position": [10, 10], "rows": 0, "columns": 2}
+    with pytest.raises(ValueError):
+        validate_stash(stash)
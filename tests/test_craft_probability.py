@@ -0,0 +1,29 @@
+import pytest
+
+from controllers.craft_probability import CraftProbability
+from controllers.craft_simulator import CraftSimulator
+from controllers.file_manager import FileManager
+from controllers.mod_database import ModDatabase
+
+PREFIXES = (
+    "Mod,Tag,Tier,iLvl,Weight,Prefix%,Weight%\n"
+    "(14-16)% increased Fire Damage,Fire,1,1,100,25%,25\n"
+    "(9-11)% increased Cold Damage,Cold,1,1,300,75%,75\n"
+)
+
+
+@pytest.mark.parametrize("suffixes", [None, "Mod,Tag,Tier,iLvl,Weight,Prefix%,Weight%\n"], ids=["missing", "empty"])
+def test_prefix_only_targets_match_the_simulator(tmp_path, suffixes):
+    # No suffix table, or one without rows: every roll is a single prefix
+    (tmp_path / "prefix_small.csv").write_text(PREFIXES, encoding="utf-8")
+    if suffixes is not None:
+        (tmp_path / "suffix_small.csv").write_text(suffixes, encoding="utf-8")
+    mod_database = ModDatabase(FileManager(str(tmp_path))).load()
+    targets = ["increased Fire Damage"]
+
+    odds = CraftProbability(mod_database).odds("prefix_small.csv", 84, targets)
+    assert odds.alteration_chance == pytest.approx(0.25)
+    assert odds.augmentation_used == 0.0
+
+    result = CraftSimulator(mod_database, "prefix_small.csv", 84, targets, seed=3).simulate(attempts=200_000)
+    assert result.success_rate == pytest.approx(odds.attempt_chance, abs=0.005)
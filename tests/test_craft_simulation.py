@@ -0,0 +1,194 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from controllers.craft_controllers.magic_craft_controller import MagicCraftController
+from controllers.file_manager import FileManager
+from controllers.game_simulator import SimulatedGame
+from controllers.mod_database import ModDatabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOD_FILE = "prefix_jewel.csv"
+
+
+@pytest.fixture
+def simulation(monkeypatch, tmp_path):
+    """A MagicCraftController crafting a jewel in a SimulatedGame with all delays at zero."""
+    monkeypatch.chdir(ROOT)  # Config and mod file paths are relative to the repository root
+    mod_database = ModDatabase().load()
+    game = SimulatedGame(mod_database, MagicCraftController.load_items_positions(), seed=5, mod_file=MOD_FILE)
+    controller = MagicCraftController(input_backend=game.input, clipboard=game.clipboard,
+                                      mod_database=mod_database, mod_file=MOD_FILE)
+    controller.keyboard.key_press_delay = 0
+    controller.keyboard.clipboard_copy_delay = 0
+    controller.mouse.duration = 0
+    controller.mouse.click_delay = 0
+    controller.telemetry_directory = str(tmp_path)
+    yield game, controller
+    controller.close()
+
+
+def craft(controller, selected_mods):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return controller.start_magic_craft(selected_mods)
+
+
+def test_crafts_until_the_target_rolls(simulation):
+    game, controller = simulation
+    controller.max_retries = 5000
+
+    assert craft(controller, ["faster start of Energy Shield Recharge"])
+    mods = controller.item_data["parsed"].mods
+    assert any("faster start of Energy Shield Recharge" in mod["mod_value"] for mod in mods)
+    assert game.currency_used["transmutation"] == 1
+    assert game.currency_used["alteration"] >= 1
+    # Rolls are linked to the rows of the crafted base type
+    assert all(mod["table"] in ("prefix_jewel.csv", "suffix_jewel.csv") for mod in mods)
+
+
+def test_shift_held_mode_copies_with_shift_released(simulation):
+    game, controller = simulation
+    controller.max_retries = 5000
+    controller.hold_shift_currency = True
+    shift_during_copy = []
+    key_down = game.input.key_down
+
+    def record_copy_chord(key):
+        if key == 'c':
+            shift_during_copy.append('shift' in game.input.pressed)
+        key_down(key)
+
+    game.input.key_down = record_copy_chord
+    assert craft(controller, ["faster start of Energy Shield Recharge"])
+    assert shift_during_copy and not any(shift_during_copy)
+    assert controller.held_currency is None and 'shift' not in game.input.pressed
+
+
+def test_stops_after_max_retries(simulation):
+    game, controller = simulation
+    controller.max_retries = 20
+
+    assert not craft(controller, ["This mod does not exist"])
+    assert game.currency_used.get("alteration", 0) + game.currency_used.get("augmentation", 0) == 20
+
+
+def test_repeated_rolls_hit_the_item_cache(simulation):
+    game, controller = simulation
+    controller.max_retries = 300
+    controller.item_cache.resize(1024)
+
+    craft(controller, ["This mod does not exist"])
+    stats = controller.item_cache.stats()
+    assert stats["hits"] > 0
+    assert stats["hits"] + stats["misses"] == controller.telemetry.rolls + 1
+
+    controller.begin_session(["Another target"])
+    assert len(controller.item_cache) == 0  # New targets drop the cached matches
+
+
+def test_item_cache_is_off_by_default(simulation):
+    game, controller = simulation
+    controller.max_retries = 300
+
+    craft(controller, ["This mod does not exist"])
+    assert controller.item_cache.max_size == 0 and len(controller.item_cache) == 0
+    assert controller.item_cache.stats()["hits"] == 0
+
+
+def test_stop_key_ends_the_craft(simulation):
+    game, controller = simulation
+    controller.max_retries = 10_000
+    clicks = 0
+    click = controller.mouse.click
+
+    def click_and_press_stop(*args, **kwargs):
+        nonlocal clicks
+        clicks += 1
+        if clicks == 10:
+            game.input.key_down(controller.stop_key)
+            game.input.key_up(controller.stop_key)
+        return click(*args, **kwargs)
+
+    controller.mouse.click = click_and_press_stop
+    assert not craft(controller, ["This mod does not exist"])
+    assert clicks < 20
+
+
+def test_invalid_stop_key_is_reported_and_blocks_crafting(simulation, monkeypatch, capsys):
+    game, controller = simulation
+
+    def validate_key(key):
+        raise ValueError(f"Unknown key '{key}'.")
+
+    monkeypatch.setattr(game.input, "validate_key", validate_key)
+    previous = controller.mouse.stop_subscription
+    assert not controller.mouse.check_stop_loop("F3")
+    assert "'F3'" in capsys.readouterr().out
+    assert controller.mouse.stop_subscription is previous  # A bad reload keeps the working key
+
+    controller.mouse.stop_listening()
+    assert not controller.mouse.check_stop_loop("F3")
+
+    with pytest.raises(ValueError):
+        controller.begin_session(["faster start of Energy Shield Recharge"])
+    assert not game.currency_used
+
+
+def prefix_only_game(tmp_path):
+    """A SimulatedGame over a base type with two prefixes and no suffixes."""
+    (tmp_path / "prefix_small.csv").write_text(
+        "Mod,Tag,Tier,iLvl,Weight,Prefix%,Weight%\n"
+        "(14-16)% increased Fire Damage,Fire,1,1,100,50%,50\n"
+        "(9-11)% increased Cold Damage,Cold,1,1,100,50%,50\n", encoding="utf-8")
+    mod_database = ModDatabase(FileManager(str(tmp_path))).load()
+    stash = MagicCraftController.load_items_positions()
+    return SimulatedGame(mod_database, stash, seed=1, mod_file="prefix_small.csv")
+
+
+def test_copying_an_unchanged_item_gives_the_same_text(simulation):
+    game, controller = simulation
+    game.set_item("Normal")
+    game.item = game.items[game.item_rect]
+    assert game.apply_currency("transmutation")
+    text = game.item_text()
+    assert text == game.item_text()
+
+    assert game.apply_currency("alteration")
+    rolls = {game.item_text() for _ in range(3)}
+    assert len(rolls) == 1
+
+
+def test_empty_affix_pool_falls_back_to_the_other_type(simulation, tmp_path):
+    game = prefix_only_game(tmp_path)
+    game.item = game.items[game.item_rect]
+    assert game.apply_currency("transmutation")
+    for _ in range(20):
+        assert game.apply_currency("alteration")
+        assert len(game.item.affixes["prefix"]) == 1 and not game.item.affixes["suffix"]
+    assert not game.apply_currency("augmentation")  # No suffix to add
+
+
+def test_rare_rolls_stop_when_the_pools_run_out(simulation, tmp_path):
+    game = prefix_only_game(tmp_path)
+    game.item = game.items[game.item_rect]
+    assert game.apply_currency("alchemy")
+    for _ in range(20):
+        assert game.apply_currency("chaos")
+        prefixes = game.item.affixes["prefix"]
+        assert len(prefixes) == 2 and not game.item.affixes["suffix"]
+        assert len({table.templates[row] for table, row, _ in prefixes}) == 2
+
+
+def test_unchanged_text_repeats_the_copy_until_the_delay_runs_out(simulation):
+    game, controller = simulation
+    game.set_item("Normal")
+    controller.move_mouse(*controller.item_center)
+    controller.keyboard.clipboard_copy_delay = 0.02
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        text = controller.keyboard.get_clipboard_data()
+        copies = game.copies
+        assert controller.keyboard.get_clipboard_data(text) == text
+    assert game.copies - copies > 1
@@ -0,0 +1,116 @@
+import os
+from array import array
+
+from controllers.file_manager import CACHE_DIRECTORY, FileManager
+
+CSV = (
+    "Mod,Tag,Tier,iLvl,Weight,Prefix%,Weight%\n"
+    "(14-16)% increased Fire Damage,\"Damage, Fire\",1,60,250,1.5%,0.75\n"
+    "(10-12)% increased Cold Damage — ✓,Cold,2,,500,2%,\n"
+    "\"Adds (1-2) to (3-4) Fire Damage, 5% chance to Ignite\",,3,1,0,,0.1\n"
+)
+
+
+def write_mod_file(directory, name="prefix_test.csv", text=CSV):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(text)
+    return path
+
+
+def cache_path(directory, name="prefix_test.csv"):
+    return os.path.join(directory, CACHE_DIRECTORY, name + ".bin")
+
+
+def test_columns_are_typed(tmp_path, capsys):
+    write_mod_file(tmp_path)
+    columns = FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")
+    output = capsys.readouterr().out
+
+    assert columns["Mod"][2] == "Adds (1-2) to (3-4) Fire Damage, 5% chance to Ignite"
+    assert columns["Tier"] == array("i", [1, 2, 3])
+    assert columns["iLvl"] == array("i", [60, 0, 1])
+    assert columns["Prefix%"] == array("d", [1.5, 2.0, 0.0])
+    assert columns["Weight%"] == array("d", [0.75, 0.0, 0.1])
+    # Empty numbers read as 0, but never silently
+    assert "empty iLvl cells on line(s) 3;" in output
+    assert "empty Prefix% cells on line(s) 4;" in output
+    assert "empty Weight% cells on line(s) 3;" in output
+    assert "Weight cells" not in output
+
+
+def test_cache_round_trip(tmp_path):
+    write_mod_file(tmp_path)
+    parsed = FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")
+    assert os.path.exists(cache_path(tmp_path))
+
+    # A new FileManager reads the binary cache instead of the CSV
+    manager = FileManager(str(tmp_path))
+    manager._parse_mod_columns = None
+    cached = manager.load_mod_columns("prefix_test.csv")
+
+    assert cached == parsed
+    assert {name: type(values) for name, values in cached.items()} == {name: type(values) for name, values in parsed.items()}
+    assert cached["Tier"].typecode == "i" and cached["Weight%"].typecode == "d"
+
+
+def test_cache_is_invalidated_when_the_csv_changes(tmp_path):
+    path = write_mod_file(tmp_path)
+    manager = FileManager(str(tmp_path))
+    assert manager.load_mod_columns("prefix_test.csv")["Weight"][0] == 250
+
+    # Same size, only the mtime tells the files apart
+    write_mod_file(tmp_path, text=CSV.replace(",250,", ",999,"))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")["Weight"][0] == 999
+
+
+def test_cache_is_invalidated_when_the_size_changes(tmp_path):
+    path = write_mod_file(tmp_path)
+    stat = os.stat(path)
+    FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")
+
+    write_mod_file(tmp_path, text=CSV + "(1-2)% increased Life,Life,1,1,100,1%,1\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # Keep the old mtime
+
+    assert len(FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")["Mod"]) == 4
+
+
+def test_corrupt_cache_falls_back_to_the_csv(tmp_path):
+    write_mod_file(tmp_path)
+    expected = FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")
+
+    with open(cache_path(tmp_path), "r+b") as file:
+        data = file.read()
+        file.seek(0)
+        file.write(data[:len(data) // 2])
+        file.truncate()
+
+    assert FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv") == expected
+
+
+def test_truncated_column_is_not_loaded_short(tmp_path):
+    write_mod_file(tmp_path)
+    expected = FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv")
+
+    # Drop one double from the last column: still a whole number of items
+    with open(cache_path(tmp_path), "r+b") as file:
+        file.truncate(os.path.getsize(cache_path(tmp_path)) - 8)
+
+    truncated_size = os.path.getsize(cache_path(tmp_path))
+    assert FileManager(str(tmp_path)).load_mod_columns("prefix_test.csv") == expected
+    assert os.path.getsize(cache_path(tmp_path)) == truncated_size + 8  # Rebuilt from the CSV
+
+
+def test_list_files_is_sorted_and_follows_the_directory(tmp_path):
+    write_mod_file(tmp_path, "suffix_b.csv")
+    write_mod_file(tmp_path, "prefix_a.csv")
+    manager = FileManager(str(tmp_path))
+    assert manager.list_files() == ["prefix_a.csv", "suffix_b.csv"]
+
+    write_mod_file(tmp_path, "prefix_c.csv")
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert manager.list_files() == ["prefix_a.csv", "prefix_c.csv", "suffix_b.csv"]
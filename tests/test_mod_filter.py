@@ -0,0 +1,166 @@
+import pytest
+
+from controllers.mod_filter import FilterSyntaxError, ModFilter, compile_filter, tokenize
+from controllers.mod_parser import ModParser
+
+
+def make_item(*mods):
+    """Item text in the advanced copy format with (affix type, tier, mod line) mods."""
+    lines = ["Item Class: Jewels", "Rarity: Rare", "Test Jewel", "--------", "Item Level: 84", "--------"]
+    for affix_type, tier, text in mods:
+        lines.append(f'{{ {affix_type} Modifier "Test" (Tier: {tier}) — Damage }}')
+        lines.append(text)
+    lines.append("--------")
+    return ModParser().parse_item("\n".join(lines) + "\n")
+
+
+FIRE = ("Prefix", 1, "16(14-16)% increased Fire Damage")
+COLD = ("Prefix", 3, "10(9-11)% increased Cold Damage")
+CHAOS = ("Suffix", 2, "+12(10-12)% to Chaos Damage over Time Multiplier")
+LIFE = ("Suffix", 1, "+8(7-9) to maximum Life")
+
+
+def matches(expression, *mods):
+    return compile_filter(expression).matches(make_item(*mods))
+
+
+class TestPrecedence:
+    def test_and_binds_tighter_than_or(self):
+        # "Fire" OR ("Cold" AND "Chaos")
+        expression = '"Fire Damage" OR "Cold Damage" AND "Chaos Damage"'
+        assert matches(expression, FIRE)
+        assert not matches(expression, COLD)
+        assert matches(expression, COLD, CHAOS)
+
+    def test_parentheses_override_precedence(self):
+        expression = '("Fire Damage" OR "Cold Damage") AND "Chaos Damage"'
+        assert not matches(expression, FIRE)
+        assert matches(expression, FIRE, CHAOS)
+
+    def test_not_binds_tighter_than_and(self):
+        expression = 'NOT "Chaos Damage" AND "Fire Damage"'
+        assert matches(expression, FIRE)
+        assert not matches(expression, FIRE, CHAOS)
+        assert not matches(expression, COLD)
+
+    def test_keywords_are_case_insensitive(self):
+        assert matches('"Fire Damage" and not "Chaos Damage"', FIRE)
+
+
+class TestCountAndNot:
+    def test_count_of_leaves(self):
+        expression = 'COUNT("Fire Damage", "Cold Damage", "Chaos Damage") >= 2'
+        assert not matches(expression, FIRE)
+        assert matches(expression, FIRE, COLD)
+        assert matches(expression, FIRE, COLD, CHAOS)
+
+    def test_count_with_nested_groups(self):
+        # Each argument counts once, whether a leaf or a group
+        expression = 'COUNT("Fire Damage" AND "Cold Damage", NOT "Chaos Damage", "Life") = 2'
+        assert matches(expression, FIRE, COLD, CHAOS, LIFE)
+        assert matches(expression, FIRE, COLD)  # AND group + NOT Chaos
+        assert matches(expression, LIFE)  # NOT Chaos + Life
+        assert not matches(expression, FIRE)  # NOT Chaos only
+        assert not matches(expression, FIRE, COLD, LIFE)  # All three
+
+    def test_not_of_count(self):
+        expression = 'NOT COUNT("Fire Damage", "Cold Damage") >= 2'
+        assert matches(expression, FIRE)
+        assert not matches(expression, FIRE, COLD)
+
+    def test_double_not(self):
+        assert matches('NOT NOT "Fire Damage"', FIRE)
+        assert not matches('NOT NOT "Fire Damage"', COLD)
+
+    def test_count_inside_and_or(self):
+        expression = '"Life" OR COUNT("Fire Damage", "Cold Damage") >= 2 AND NOT "Chaos Damage"'
+        assert matches(expression, LIFE, CHAOS)
+        assert matches(expression, FIRE, COLD)
+        assert not matches(expression, FIRE, COLD, CHAOS)
+
+
+class TestConditions:
+    def test_tier(self):
+        assert matches('"Fire Damage" [tier <= 1]', FIRE)
+        assert not matches('"Cold Damage" [tier <= 2]', COLD)
+
+    def test_value(self):
+        assert matches('"Fire Damage" [value >= 15]', FIRE)
+        assert not matches('"Fire Damage" [value > 16]', FIRE)
+
+    def test_affix_type(self):
+        assert matches('"Fire Damage" [prefix]', FIRE)
+        assert not matches('"Fire Damage" [suffix]', FIRE)
+
+    def test_conditions_hold_for_the_same_mod(self):
+        # Two "increased ... Damage" mods: only COLD is tier 3, only FIRE rolled >= 15
+        expression = '"increased" [tier >= 3, value >= 15]'
+        assert not matches(expression, FIRE, COLD)
+        assert matches('"increased" [tier >= 3, value < 15]', FIRE, COLD)
+
+    def test_conditions_are_per_leaf(self):
+        expression = '"Damage" [tier = 1] AND "Damage" [tier = 3]'
+        assert matches(expression, FIRE, COLD)
+        assert not matches(expression, FIRE)
+
+    def test_missing_field_fails_the_condition(self):
+        # Weight is only known for mods linked to the mod files
+        assert not matches('"Fire Damage" [weight < 1000]', FIRE)
+
+
+class TestSyntaxErrors:
+    @pytest.mark.parametrize("expression, position", [
+        ('"Fire" AND', 10),
+        ('"Fire" OR OR "Cold"', 10),
+        ('("Fire"', 7),
+        ('"Fire")', 6),
+        ('Fire', 0),
+        ('"Fire" [tier 2]', 13),
+        ('"Fire" [colour = 2]', 8),
+        ('COUNT("Fire") 2', 14),
+        ('"Fire" & "Cold"', 7),
+        ('""', 0),
+        ('"Fire"  ?', 8),
+    ])
+    def test_error_position(self, expression, position):
+        with pytest.raises(FilterSyntaxError) as error:
+            compile_filter(expression)
+        assert error.value.position == position
+
+    def test_syntax_error_is_a_value_error(self):
+        with pytest.raises(ValueError):
+            compile_filter('"Fire" AND')
+
+    def test_tokens_carry_offsets(self):
+        assert [token[2] for token in tokenize('NOT  "Fire" [tier<=2]')] == [0, 5, 12, 13, 17, 19, 20, 21]
+
+
+class TestFromMods:
+    def test_filter_types(self):
+        item = make_item(FIRE, COLD)
+        assert ModFilter.from_mods(["Fire Damage", "Cold Damage"]).matches(item)
+        assert not ModFilter.from_mods(["Fire Damage", "Life"]).matches(item)
+        assert ModFilter.from_mods(["Fire Damage", "Life"], "or").matches(item)
+        assert ModFilter.from_mods(["Fire Damage", "Cold Damage", "Life"], "count", 2).matches(item)
+        assert not ModFilter.from_mods(["Fire Damage", "Life", "Chaos"], "count", 2).matches(item)
+
+    @pytest.mark.parametrize("filter_type, count, expression", [
+        ("and", None, '"Fire Damage" AND "Life"'),
+        ("or", None, '"Fire Damage" OR "Life"'),
+        ("count", 1, 'COUNT("Fire Damage", "Life") >= 1'),
+        ("count", None, 'COUNT("Fire Damage", "Life") >= 2'),
+    ])
+    def test_expression_text_matches_the_filter(self, filter_type, count, expression):
+        mod_filter = ModFilter.from_mods(["Fire Damage", "Life"], filter_type, count)
+        assert mod_filter.expression == expression
+        for mods in [(FIRE,), (LIFE,), (FIRE, LIFE), (COLD,)]:
+            item = make_item(*mods)
+            assert compile_filter(mod_filter.expression).matches(item) == mod_filter.matches(item)
+
+    def test_empty_filter_matches_everything(self):
+        assert compile_filter("  ").matches(make_item(FIRE))
+        assert ModFilter.from_mods([]).matches(make_item())
+
+    def test_unknown_filter_type(self):
+        with pytest.raises(ValueError):
+            ModFilter.from_mods(["Fire Damage"], "xor")